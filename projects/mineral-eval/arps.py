@@ -0,0 +1,143 @@
+"""
+Arps Decline Curves
+Closed-form rates and cumulative production for exponential (b = 0),
+hyperbolic (0 < b, b != 1) and harmonic (b = 1) decline, plus modified
+hyperbolic decline that switches to exponential once the instantaneous decline
+falls to a terminal rate.
+
+Conventions (same as core.ProductionDecline):
+- qi is a daily rate; t is in years
+- Decline rates are nominal annual (use nominal_from_effective for quoted
+  effective rates)
+- Cumulative volume is the integral of the daily rate over days, so
+  EUR = cumulative(life_years) is in the rate's volume unit
+
+Monthly volumes are differences of the cumulative at month boundaries:
+exact per-month totals with one power/exp per month instead of stepping days.
+Standard library only (core.py imports this module).
+"""
+
+import math
+import operator
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+DAYS_PER_YEAR = 365.0
+
+# |b| or |b - 1| below this uses the exponential / harmonic limit
+_B_EPSILON = 1e-9
+
+DECLINE_EXPONENTS = {"exponential": 0.0, "harmonic": 1.0}
+
+
+def decline_exponent(decline_type: str, b: float) -> float:
+    """Arps b for a decline_curve_type ('exponential', 'harmonic' or 'hyperbolic')"""
+    if decline_type == "hyperbolic":
+        return b
+    if decline_type not in DECLINE_EXPONENTS:
+        raise ValueError(f"Unknown decline type {decline_type!r}")
+    return DECLINE_EXPONENTS[decline_type]
+
+
+def nominal_from_effective(effective: float, b: float = 0.0) -> float:
+    """Nominal annual decline from an effective annual (first-year) decline"""
+    if effective <= 0:
+        return 0.0
+    if abs(b) < _B_EPSILON:
+        return -math.log(1 - effective)
+    # Secant effective decline
+    return ((1 - effective) ** (-b) - 1) / b
+
+
+@dataclass(frozen=True)
+class ArpsDecline:
+    """
+    One Arps (optionally modified hyperbolic) decline curve.
+    
+    Args:
+        qi: Initial daily rate
+        di: Initial nominal annual decline
+        b: Arps exponent (0 exponential, 1 harmonic)
+        terminal_decline: Nominal annual decline to switch to exponential at
+            (None = pure Arps)
+    """
+    qi: float
+    di: float
+    b: float = 0.0
+    terminal_decline: Optional[float] = None
+    
+    @property
+    def switch_time(self) -> Optional[float]:
+        """Years until the instantaneous decline di/(1 + b·di·t) reaches terminal_decline"""
+        d_term = self.terminal_decline
+        if d_term is None or d_term <= 0 or self.b < _B_EPSILON or self.di <= d_term:
+            return None
+        return (self.di / d_term - 1) / (self.b * self.di)
+    
+    def _pure_rate(self, t: float) -> float:
+        if self.di <= 0:
+            return self.qi
+        if abs(self.b) < _B_EPSILON:
+            return self.qi * math.exp(-self.di * t)
+        return self.qi * (1 + self.b * self.di * t) ** (-1 / self.b)
+    
+    def rate(self, t: float) -> float:
+        """Daily rate at t years"""
+        t_switch = self.switch_time
+        if t_switch is None or t <= t_switch:
+            return self._pure_rate(t)
+        return self._pure_rate(t_switch) * math.exp(-self.terminal_decline * (t - t_switch))
+    
+    def cumulative_function(self) -> Callable[[float], float]:
+        """cumulative(t) with the curve's constants and switch point bound once"""
+        qi, di, b = self.qi, self.di, self.b
+        if di <= 0:
+            pure = lambda t: qi * t * DAYS_PER_YEAR
+        elif abs(b) < _B_EPSILON:
+            scale = qi / di * DAYS_PER_YEAR
+            pure = lambda t: -scale * math.expm1(-di * t)
+        elif abs(b - 1) < _B_EPSILON:
+            scale = qi / di * DAYS_PER_YEAR
+            pure = lambda t: scale * math.log1p(di * t)
+        else:
+            scale = qi / ((1 - b) * di) * DAYS_PER_YEAR
+            bdi = b * di
+            power = (b - 1) / b
+            pure = lambda t: scale * (1 - (1 + bdi * t) ** power)
+        
+        t_switch = self.switch_time
+        if t_switch is None:
+            return lambda t: pure(t) if t > 0 else 0.0
+        d_term = self.terminal_decline
+        at_switch = pure(t_switch)
+        tail_scale = self._pure_rate(t_switch) / d_term * DAYS_PER_YEAR
+        
+        def modified(t: float) -> float:
+            if t <= t_switch:
+                return pure(t) if t > 0 else 0.0
+            # Exponential tail at the terminal decline
+            return at_switch - tail_scale * math.expm1(-d_term * (t - t_switch))
+        return modified
+    
+    def cumulative(self, t: float) -> float:
+        """Cumulative volume produced by t years"""
+        return self.cumulative_function()(t)
+    
+    def eur(self, life_years: float) -> float:
+        return self.cumulative(life_years)
+    
+    def monthly_volumes(self, months: int) -> array:
+        """Volume produced in each of the first `months` months (month = 1/12 year)"""
+        cumulative = self.cumulative_function()
+        boundaries = [0.0]
+        boundaries.extend(cumulative(month / 12) for month in range(1, months + 1))
+        return array('d', map(operator.sub, boundaries[1:], boundaries[:-1]))
+    
+    @classmethod
+    def from_eur(cls, eur: float, di: float, b: float = 0.0, life_years: float = 50,
+                 terminal_decline: Optional[float] = None) -> 'ArpsDecline':
+        """Curve whose cumulative over life_years equals eur (cumulative is linear in qi)"""
+        unit = cls(1.0, di, b, terminal_decline).cumulative(life_years)
+        qi = eur / unit if unit > 0 else 0.0
+        return cls(qi, di, b, terminal_decline)
@@ -0,0 +1,358 @@
+"""
+Batch Evaluation
+Evaluates many DealInputs together by stacking their cash flows into a
+deals × months matrix, then computing NPV, IRR, MoM and payback for every
+deal with matrix operations instead of one MineralEvaluation per deal.
+
+Requires numpy (see vectorized.py).
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core import (
+    DealInputs, IRR_EXPANDED_HIGHS, IRR_HIGH, IRR_LOW, IRR_MAX_ITERATIONS, IRR_NPV_TOLERANCE, TruncatedTail,
+    discount_factors, monthly_discount_factor, well_cost_profile, working_interest,
+)
+from vectorized import np, require_numpy, volume_profile
+
+
+@dataclass
+class BatchResults:
+    """Metrics for a batch of deals (row i belongs to deals[i])"""
+    deal_names: List[str]
+    discount_rates: List[float]  # Columns of npv
+    npv: 'np.ndarray'  # deals × rates
+    irr: 'np.ndarray'  # NaN where no IRR exists
+    mom: 'np.ndarray'  # NaN where there is no outflow
+    payback_months: 'np.ndarray'  # NaN where cumulative cash flow never turns positive
+    total_capex: 'np.ndarray'
+    total_revenue: 'np.ndarray'
+    total_opex: 'np.ndarray'
+    total_tax: 'np.ndarray'
+    cumulative_cash_flow: 'np.ndarray'
+    acquisition_cost: 'np.ndarray'
+    deal_rates: List[List[float]]  # Rates summary() reports: each deal's own, or the explicit discount_rates
+    economic_limit_month: 'np.ndarray'  # NaN where economic_limit is off
+    truncated_tail: List[Optional[TruncatedTail]]  # None where nothing was cut
+    
+    def __len__(self) -> int:
+        return len(self.deal_names)
+    
+    def summary(self, i: int) -> Dict:
+        """Return deal i in the same shape as MineralEvaluation.summary()"""
+        rate_index = {rate: j for j, rate in enumerate(self.discount_rates)}
+        summary = {
+            "deal_name": self.deal_names[i],
+            "irr": _optional(self.irr[i]),
+            "mom": _optional(self.mom[i]),
+            "payback_months": _optional(self.payback_months[i]),
+            "npv_by_rate": {rate: float(self.npv[i, rate_index[rate]]) for rate in self.deal_rates[i]},
+            "acquisition_cost": float(self.acquisition_cost[i]),
+            "total_capex": float(self.total_capex[i]),
+            "total_revenue": float(self.total_revenue[i]),
+            "total_opex": float(self.total_opex[i]),
+            "total_tax": float(self.total_tax[i]),
+            "cumulative_cash_flow": float(self.cumulative_cash_flow[i]),
+            "total_investment": float(self.acquisition_cost[i] + self.total_capex[i]),
+        }
+        if not np.isnan(self.economic_limit_month[i]):
+            tail = self.truncated_tail[i]
+            summary["economic_limit_month"] = int(self.economic_limit_month[i])
+            summary["truncated_tail"] = asdict(tail) if tail else None
+        return summary
+    
+    def summaries(self) -> List[Dict]:
+        """Summary dict for every deal"""
+        return [self.summary(i) for i in range(len(self))]
+
+
+def _optional(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _column(deals: Sequence[DealInputs], attr: str) -> 'np.ndarray':
+    """Per-deal parameter as a (deals, 1) column for broadcasting"""
+    return np.array([getattr(deal, attr) for deal in deals], dtype=float)[:, None]
+
+
+def net_cash_flow_matrix(deals: Sequence[DealInputs]) -> Dict[str, 'np.ndarray']:
+    """
+    Stack every deal's monthly cash flows into deals × months matrices.
+    
+    Deals with a shorter analysis_years are zero-padded to the longest horizon.
+    Deals with economic_limit are cut like the engine ledger: 'active' ends
+    after the last month whose operating cash flow exceeds the threshold.
+    
+    Returns:
+        Dict with 'net_cash_flow', 'total_revenue', 'total_tax', 'gpt_cost',
+        'capex', 'total_opex', 'gross_gas_mcf', 'gross_oil_bbl' and
+        'operating_cash_flow' matrices, a boolean 'active' mask and the
+        per-deal 'economic_limit_month' (NaN where economic_limit is off)
+    """
+    require_numpy()
+    horizons = np.array([deal.analysis_years * 12 for deal in deals])
+    max_horizon = int(horizons.max()) if len(deals) else 0
+    active = np.arange(max_horizon)[None, :] < horizons[:, None]
+    
+    # Volumes: one profile per deal, stacked into the matrix
+    gross_gas = np.zeros((len(deals), max_horizon))
+    gross_oil = np.zeros((len(deals), max_horizon))
+    for i, deal in enumerate(deals):
+        gas, oil = volume_profile(deal)
+        gross_gas[i, :len(gas)] = gas
+        gross_oil[i, :len(oil)] = oil
+    
+    # NGL from shrunk gas
+    shrunk_gas = gross_gas * _column(deals, "gas_shrink_factor")
+    gross_ngl = shrunk_gas * _column(deals, "ngl_yield_bbls_per_mmcf") / 1_000_000
+    
+    # Net to interest
+    total_nri = _column(deals, "total_nri")
+    net_gas = gross_gas * total_nri
+    net_oil = gross_oil * total_nri
+    net_ngl = gross_ngl * total_nri
+    
+    # Revenues
+    gas_price = _column(deals, "gas_price_per_mcf")
+    oil_price = _column(deals, "oil_price_per_bbl")
+    ngl_price = _column(deals, "ngl_price")
+    gas_revenue = net_gas * (gas_price + _column(deals, "gas_differential_per_mcf")) * _column(deals, "btu_adjustment")
+    oil_revenue = net_oil * (oil_price + _column(deals, "oil_differential_per_bbl"))
+    ngl_revenue = net_ngl * ngl_price
+    total_revenue = gas_revenue + oil_revenue + ngl_revenue
+    
+    # Gas Processing & Transportation (cost-bearing leases only)
+    gpt_rate = np.where(_column(deals, "is_cost_bearing_lease") > 0, _column(deals, "gas_processing_per_mcf"), 0.0)
+    gpt_cost = shrunk_gas * gpt_rate
+    
+    # Working-interest capex and opex (cost_bearing rows only)
+    capex = np.zeros((len(deals), max_horizon))
+    total_opex = np.zeros((len(deals), max_horizon))
+    bearing = [i for i, deal in enumerate(deals) if deal.cost_bearing]
+    if bearing:
+        producing_wells = np.zeros((len(deals), max_horizon))
+        for i in bearing:
+            gross_capex, wells = well_cost_profile(deals[i])
+            capex[i, :len(gross_capex)] = gross_capex
+            producing_wells[i, :len(wells)] = wells
+        wi = np.array([working_interest(deal) if deal.cost_bearing else 0.0 for deal in deals])[:, None]
+        gross_water = (gross_oil * _column(deals, "water_yield_bbls_per_bbl_oil") +
+                       gross_gas * _column(deals, "water_yield_bbls_per_mmcf"))
+        capex *= wi
+        total_opex = producing_wells * (_column(deals, "fixed_opex_per_month") * wi) + (
+            gross_oil * (_column(deals, "variable_opex_oil_per_bbl") * wi) +
+            gross_gas * (_column(deals, "variable_opex_gas_per_mcf") * wi) +
+            gross_water * (_column(deals, "variable_opex_water_per_bblw") * wi)
+        )
+    
+    # Taxes
+    severance_tax = (
+        net_oil * oil_price * _column(deals, "severance_tax_oil_pct") +
+        net_gas * gas_price * _column(deals, "severance_tax_gas_pct") +
+        net_ngl * ngl_price * _column(deals, "severance_tax_ngl_pct")
+    )
+    total_tax = severance_tax + total_revenue * _column(deals, "ad_valorem_tax_pct")
+    
+    # Acquisition cost and G&A fees at month 0, annual G&A every active month
+    acquisition_cost = _column(deals, "acquisition_cost")[:, 0]
+    upfront_ga_fees = _column(deals, "upfront_ga_fees")[:, 0]
+    upfront = np.zeros((len(deals), max_horizon))
+    if max_horizon:
+        upfront[:, 0] = acquisition_cost + upfront_ga_fees
+    monthly_ga = np.where(active, _column(deals, "annual_ga") / 12.0, 0.0)
+    
+    net_cash_flow = np.where(active, total_revenue - total_opex - gpt_cost - total_tax - capex - upfront - monthly_ga, 0.0)
+    
+    # Operating cash flow: net before acquisition cost, upfront G&A and capex (core.operating_cash_flow)
+    operating = net_cash_flow.copy()
+    if max_horizon:
+        operating[:, 0] += acquisition_cost
+        operating[:, 0] += upfront_ga_fees
+    operating += capex
+    
+    # Economic limit: end each limited row after its last month above the threshold
+    limit_month = np.full(len(deals), np.nan)
+    for i, deal in enumerate(deals):
+        if deal.economic_limit:
+            above = np.flatnonzero(operating[i, :horizons[i]] > deal.economic_limit_threshold)
+            limit_month[i] = above[-1] if len(above) else -1
+            active[i, max(int(limit_month[i]), 0) + 1:] = False  # Month 0 carries the acquisition cost
+    
+    return {
+        "net_cash_flow": np.where(active, net_cash_flow, 0.0),
+        "total_revenue": total_revenue,
+        "total_tax": total_tax,
+        "gpt_cost": gpt_cost,
+        "total_opex": total_opex,
+        "capex": capex,
+        "gross_gas_mcf": gross_gas,
+        "gross_oil_bbl": gross_oil,
+        "operating_cash_flow": operating,
+        "active": active,
+        "economic_limit_month": limit_month,
+    }
+
+
+def npv_matrix(net_cash_flow: 'np.ndarray', rates: Sequence[float]) -> 'np.ndarray':
+    """NPV of each row at each rate from the shared discount-factor cache (deals × rates)"""
+    horizon = net_cash_flow.shape[1]
+    table = np.array([np.frombuffer(discount_factors(rate, horizon)) for rate in rates]).reshape(len(rates), horizon)
+    return net_cash_flow @ table.T
+
+
+def _npv_and_derivative(net_cash_flow: 'np.ndarray', v: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """NPV of row i and dNPV/dv at monthly discount factor v[i]"""
+    months = np.arange(net_cash_flow.shape[1])
+    powers = np.exp(np.log(v)[:, None] * months[None, :])
+    npv = np.einsum("ij,ij->i", net_cash_flow, powers)
+    derivative = np.einsum("ij,ij->i", net_cash_flow * months[None, :], powers) / v
+    return npv, derivative
+
+
+def irr_vector(net_cash_flow: 'np.ndarray', tolerance: float = IRR_NPV_TOLERANCE,
+               max_iterations: int = IRR_MAX_ITERATIONS) -> 'np.ndarray':
+    """
+    IRR of every row, solved together with the same bracketed Newton method
+    as core.solve_irr (monthly discount factor, bisection fallback).
+    
+    Returns:
+        IRR per row, NaN where NPV does not change sign within the bounds
+        or the solve did not converge
+    """
+    n = net_cash_flow.shape[0]
+    v_a = np.full(n, monthly_discount_factor(IRR_LOW))
+    v_b = np.full(n, monthly_discount_factor(IRR_HIGH))
+    npv_a = net_cash_flow.sum(axis=1)
+    npv_b = _npv_and_derivative(net_cash_flow, v_b)[0]
+    
+    bracketed = npv_a * npv_b <= 0
+    # NPV positive at 1000%: expand the upper bound like the scalar solver
+    needs_expansion = ~bracketed & (npv_a > 0)
+    for test_high in IRR_EXPANDED_HIGHS:
+        if not needs_expansion.any():
+            break
+        rows = np.flatnonzero(needs_expansion)
+        v_test = np.full(len(rows), monthly_discount_factor(test_high))
+        npv_test = _npv_and_derivative(net_cash_flow[rows], v_test)[0]
+        found = rows[npv_test < 0]
+        v_b[found] = v_test[0]
+        npv_b[found] = npv_test[npv_test < 0]
+        bracketed[found] = True
+        needs_expansion[found] = False
+    
+    rows = np.flatnonzero(bracketed)
+    flows = net_cash_flow[rows]
+    lo, npv_lo, hi = v_a[rows], npv_a[rows], v_b[rows]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v = np.where(npv_lo == 0, lo, lo - npv_lo * (lo - hi) / (npv_lo - npv_b[rows]))
+    solution = np.full(len(rows), np.nan)
+    pending = np.ones(len(rows), dtype=bool)
+    
+    for iteration in range(max_iterations):
+        if not pending.any():
+            break
+        idx = np.flatnonzero(pending)
+        npv, derivative = _npv_and_derivative(flows[idx], v[idx])
+        
+        done = np.abs(npv) < tolerance
+        solution[idx[done]] = v[idx[done]]
+        
+        # Keep each root bracketed between lo (same sign as NPV at 0%) and hi
+        same_side = (npv > 0) == (npv_lo[idx] > 0)
+        lo[idx] = np.where(same_side, v[idx], lo[idx])
+        npv_lo[idx] = np.where(same_side, npv, npv_lo[idx])
+        hi[idx] = np.where(same_side, hi[idx], v[idx])
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            next_v = v[idx] - npv / derivative
+        outside = ~((np.minimum(lo[idx], hi[idx]) < next_v) & (next_v < np.maximum(lo[idx], hi[idx])))
+        next_v = np.where(outside, (lo[idx] + hi[idx]) / 2, next_v)
+        
+        stalled = ~done & (np.abs(next_v - v[idx]) <= 1e-15 * v[idx])
+        solution[idx[stalled]] = next_v[stalled]
+        v[idx] = next_v
+        pending[idx[done | stalled]] = False
+    
+    irr = np.full(n, np.nan)
+    irr[rows] = solution ** -12 - 1
+    return irr
+
+
+def evaluate_batch(deals: Sequence[DealInputs], discount_rates: Optional[Sequence[float]] = None) -> BatchResults:
+    """
+    Evaluate many deals in one matrix pass.
+    
+    Args:
+        deals: Deals to evaluate (lease/royalty or cost_bearing working interest,
+            optionally cut at their economic limit)
+        discount_rates: NPV rates to compute and report for every deal;
+            defaults to the union of each deal's discount_rates, with each
+            summary reporting that deal's own rates
+    
+    Returns:
+        BatchResults with one row per deal
+    """
+    require_numpy()
+    deals = list(deals)
+    if discount_rates is None:
+        discount_rates = sorted({rate for deal in deals for rate in deal.discount_rates})
+        deal_rates = [list(deal.discount_rates) for deal in deals]
+    else:
+        discount_rates = list(discount_rates)
+        deal_rates = [discount_rates] * len(deals)
+    
+    matrices = net_cash_flow_matrix(deals)
+    net_cash_flow = matrices["net_cash_flow"]
+    
+    # MoM: inflows over outflows
+    total_inflow = np.where(net_cash_flow > 0, net_cash_flow, 0.0).sum(axis=1)
+    total_outflow = -np.where(net_cash_flow < 0, net_cash_flow, 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mom = np.where(total_outflow > 0, total_inflow / total_outflow, np.nan)
+    
+    # Payback: first month the running total turns non-negative
+    paid_back = (np.cumsum(net_cash_flow, axis=1) >= 0) & matrices["active"]
+    payback = np.where(paid_back.any(axis=1), paid_back.argmax(axis=1), np.nan)
+    
+    active = matrices["active"]
+    return BatchResults(
+        deal_names=[deal.deal_name for deal in deals],
+        discount_rates=discount_rates,
+        npv=npv_matrix(net_cash_flow, discount_rates),
+        irr=irr_vector(net_cash_flow),
+        mom=mom,
+        payback_months=payback.astype(float),
+        total_capex=np.where(active, matrices["capex"], 0.0).sum(axis=1),
+        total_revenue=np.where(active, matrices["total_revenue"], 0.0).sum(axis=1),
+        total_opex=np.where(active, matrices["total_opex"], 0.0).sum(axis=1),
+        total_tax=np.where(active, matrices["total_tax"], 0.0).sum(axis=1),
+        cumulative_cash_flow=net_cash_flow.sum(axis=1),
+        acquisition_cost=_column(deals, "acquisition_cost")[:, 0],
+        deal_rates=deal_rates,
+        economic_limit_month=matrices["economic_limit_month"],
+        truncated_tail=_truncated_tails(deals, matrices),
+    )
+
+
+def _truncated_tails(deals: Sequence[DealInputs], matrices: Dict[str, 'np.ndarray']) -> List[Optional[TruncatedTail]]:
+    """Totals of the months each economic limit cut, like MineralEvaluation.truncated_tail"""
+    tails: List[Optional[TruncatedTail]] = []
+    for i, deal in enumerate(deals):
+        keep = int(matrices["active"][i].sum())
+        horizon = deal.analysis_years * 12
+        if not deal.economic_limit or keep >= horizon:
+            tails.append(None)
+            continue
+        cut = slice(keep, horizon)
+        operating = matrices["operating_cash_flow"][i, cut]
+        tails.append(TruncatedTail(
+            first_month=keep,
+            months=horizon - keep,
+            net_cash_flow=float((operating - matrices["capex"][i, cut]).sum()),  # No month-0 items in the tail
+            operating_cash_flow=float(operating.sum()),
+            total_revenue=float(matrices["total_revenue"][i, cut].sum()),
+            gross_gas_mcf=float(matrices["gross_gas_mcf"][i, cut].sum()),
+            gross_oil_bbl=float(matrices["gross_oil_bbl"][i, cut].sum()),
+        ))
+    return tails
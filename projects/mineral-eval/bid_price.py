@@ -0,0 +1,104 @@
+"""
+Bid-Price Solver
+Maximum acquisition cost that still meets a target IRR or PV.
+
+acquisition_cost is paid at month 0 (discount factor 1), so NPV at any rate
+falls dollar for dollar with it:
+
+    NPV_r(bid) = NPV_r(0) - bid
+
+Target PV-x:  bid = NPV_x(0) - target_pv
+Target IRR:   IRR = r exactly where NPV_r = 0, and MineralEvaluation discounts
+              NPV and IRR on the same (1 + r)^(-month/12) factors, so
+              bid = NPV_r(0)
+
+Either way one evaluation without the acquisition cost and one discounted sum
+(from the shared discount-factor cache) price the deal - no iteration.
+Bids add across deals at the same target, so a package bid is the sum of
+its deals' bids.
+"""
+
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+
+from core import DealInputs, MineralEvaluation, npv_at_rates
+from vectorized import HAS_NUMPY
+
+
+@dataclass
+class BidPrice:
+    """Maximum acquisition cost for one deal at a target"""
+    deal_name: str
+    max_acquisition_cost: float
+    target: str  # "irr" or "pv"
+    rate: float  # Target IRR, or the PV discount rate
+    target_pv: float  # Required NPV at rate (0 for IRR targets)
+    npv_before_acquisition: float  # NPV at rate with acquisition_cost = 0
+
+
+def _resolve_target(target_irr: Optional[float], target_pv_rate: Optional[float],
+                    target_pv: float) -> Tuple[str, float, float]:
+    if (target_irr is None) == (target_pv_rate is None):
+        raise ValueError("Give exactly one of target_irr or target_pv_rate")
+    if target_irr is not None:
+        return "irr", target_irr, 0.0
+    return "pv", target_pv_rate, target_pv
+
+
+def solve_bid_price(deal: DealInputs, target_irr: Optional[float] = None,
+                    target_pv_rate: Optional[float] = None, target_pv: float = 0.0,
+                    backend: str = "loop") -> BidPrice:
+    """
+    Maximum acquisition cost for a deal.
+    
+    Args:
+        deal: Deal to price (its own acquisition_cost is ignored)
+        target_irr: Required IRR, e.g. 0.25
+        target_pv_rate: Discount rate of a PV target, e.g. 0.10 for PV-10
+        target_pv: Required NPV at target_pv_rate (default: break even)
+        backend: MineralEvaluation backend
+    
+    Returns:
+        BidPrice (max_acquisition_cost may be negative if the deal cannot
+        meet the target at any price)
+    """
+    target, rate, required = _resolve_target(target_irr, target_pv_rate, target_pv)
+    evaluation = MineralEvaluation(replace(deal, acquisition_cost=0.0, discount_rates=[rate]), backend=backend)
+    evaluation.generate_cash_flows()
+    npv = npv_at_rates(evaluation.cash_flows.net_cash_flow, [rate])[0]
+    return BidPrice(
+        deal_name=deal.deal_name,
+        max_acquisition_cost=npv - required,
+        target=target,
+        rate=rate,
+        target_pv=required,
+        npv_before_acquisition=npv,
+    )
+
+
+def solve_bid_prices(deals: Sequence[DealInputs], target_irr: Optional[float] = None,
+                     target_pv_rate: Optional[float] = None, target_pv: float = 0.0) -> List[BidPrice]:
+    """
+    Bid prices for a package of deals (same target for every deal).
+    
+    Uses the batch matrix path when numpy is installed, otherwise one
+    cash-flow build per deal. target_pv applies to each deal.
+    """
+    target, rate, required = _resolve_target(target_irr, target_pv_rate, target_pv)
+    if not HAS_NUMPY:
+        return [solve_bid_price(deal, target_irr, target_pv_rate, target_pv) for deal in deals]
+    
+    from batch import net_cash_flow_matrix, npv_matrix
+    unpriced = [replace(deal, acquisition_cost=0.0) for deal in deals]
+    npvs = npv_matrix(net_cash_flow_matrix(unpriced)["net_cash_flow"], [rate])[:, 0]
+    return [
+        BidPrice(
+            deal_name=deal.deal_name,
+            max_acquisition_cost=float(npv) - required,
+            target=target,
+            rate=rate,
+            target_pv=required,
+            npv_before_acquisition=float(npv),
+        )
+        for deal, npv in zip(deals, npvs)
+    ]
@@ -4,10 +4,21 @@ Core financial modeling for oil & gas deals
 Standard library only (no numpy/scipy dependencies)
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
+from array import array
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from dataclasses import FrozenInstanceError, asdict, dataclass, field, fields, replace
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime
+from itertools import accumulate
+import logging
 import math
+import operator
+import threading
+
+from arps import ArpsDecline, decline_exponent
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -24,6 +35,195 @@ class Tract:
         return (self.mineral_acres * self.royalty_rate) / self.drilling_unit_gross_acres
 
 
+class LedgerTract(Tract):
+    """
+    Read-only Tract read back from a TractLedger. The ledger holds the
+    values, so change a tract by assigning a new one:
+    ledger[i] = replace(ledger[i], mineral_acres=400).
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        object.__setattr__(self, "_sealed", True)
+    
+    def __setattr__(self, name, value):
+        if getattr(self, "_sealed", False):
+            raise FrozenInstanceError(
+                f"cannot assign to field {name!r}: tracts read from a TractLedger are read-only "
+                f"(assign ledger[i] = replace(ledger[i], {name}=...) instead)"
+            )
+        super().__setattr__(name, value)
+    
+    def __eq__(self, other):
+        if isinstance(other, Tract):
+            return asdict(self) == asdict(other)
+        return NotImplemented
+    
+    __hash__ = None
+
+
+class TractLedger(MutableSequence):
+    """
+    Title chain stored as columns (one array per Tract field), with tracts
+    grouped by unit_name and NRI cached per unit and in total.
+    
+    DealInputs keeps its tracts here, so total_nri is a cached lookup instead
+    of a walk over every Tract. It supports the full list API (insert, pop,
+    remove, clear, +, +=, ...). append/extend fold new tracts into the cached
+    sums; other changes drop the caches until next use, and a unit left
+    without tracts drops out of units. Tracts are stored by value and read
+    back as read-only LedgerTracts: change them through the ledger.
+    
+    Usage:
+        ledger = TractLedger(tracts)
+        ledger.append(Tract(40, 0.1875, 640, unit_name="Unit 2"))
+        ledger.total_nri, ledger.unit_nri("Unit 2"), ledger.nri_by_unit()
+    """
+    
+    def __init__(self, tracts: Iterable[Tract] = ()):
+        self.mineral_acres = array('d')
+        self.royalty_rate = array('d')
+        self.drilling_unit_gross_acres = array('d')
+        self.unit_index = array('l')  # Position in self.units
+        self.units: List[Optional[str]] = []  # unit_name values in first-seen order
+        self._unit_positions: Dict[Optional[str], int] = {}
+        self._total_nri: Optional[float] = 0.0
+        self._unit_nri: Optional[List[float]] = []
+        self.extend(tracts)
+    
+    def _unit_position(self, unit_name: Optional[str]) -> int:
+        position = self._unit_positions.get(unit_name)
+        if position is None:
+            position = self._unit_positions[unit_name] = len(self.units)
+            self.units.append(unit_name)
+            if self._unit_nri is not None:
+                self._unit_nri.append(0.0)
+        return position
+    
+    def append(self, tract: Tract):
+        self.extend((tract,))
+    
+    def extend(self, tracts: Iterable[Tract]):
+        for tract in tracts:
+            position = self._unit_position(tract.unit_name)
+            self.mineral_acres.append(tract.mineral_acres)
+            self.royalty_rate.append(tract.royalty_rate)
+            self.drilling_unit_gross_acres.append(tract.drilling_unit_gross_acres)
+            self.unit_index.append(position)
+            if self._total_nri is not None:
+                # Same order as summing tract.nri over the chain
+                nri = tract.nri
+                self._total_nri += nri
+                self._unit_nri[position] += nri
+    
+    def __len__(self) -> int:
+        return len(self.unit_index)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TractLedger(self[i] for i in range(*index.indices(len(self))))
+        return LedgerTract(self.mineral_acres[index], self.royalty_rate[index],
+                           self.drilling_unit_gross_acres[index], self.units[self.unit_index[index]])
+    
+    def __setitem__(self, index, tract):
+        if isinstance(index, slice):
+            tracts = list(self)
+            tracts[index] = tract
+            self._rebuild(tracts)
+            return
+        replaced_unit = self.unit_index[index]
+        self.mineral_acres[index] = tract.mineral_acres
+        self.royalty_rate[index] = tract.royalty_rate
+        self.drilling_unit_gross_acres[index] = tract.drilling_unit_gross_acres
+        self.unit_index[index] = self._unit_position(tract.unit_name)
+        if replaced_unit in self.unit_index:
+            self._invalidate()
+        else:
+            self._rebuild(list(self))
+    
+    def __delitem__(self, index):
+        tracts = list(self)
+        del tracts[index]
+        self._rebuild(tracts)
+    
+    def insert(self, index: int, tract: Tract):
+        tracts = list(self)
+        tracts.insert(index, tract)
+        self._rebuild(tracts)
+    
+    def clear(self):
+        self._rebuild(())
+    
+    def reverse(self):
+        self._rebuild(reversed(list(self)))
+    
+    def __add__(self, other: Iterable[Tract]) -> 'TractLedger':
+        if not isinstance(other, (TractLedger, list)):
+            return NotImplemented
+        return TractLedger([*self, *other])
+    
+    def __radd__(self, other: Iterable[Tract]) -> 'TractLedger':
+        if not isinstance(other, list):
+            return NotImplemented
+        return TractLedger([*other, *self])
+    
+    def __iter__(self) -> Iterator[Tract]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TractLedger):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"TractLedger({len(self)} tracts, {len(self.units)} units)"
+    
+    def _invalidate(self):
+        self._total_nri = None
+        self._unit_nri = None
+    
+    def _rebuild(self, tracts: Iterable[Tract]):
+        """Reload from tracts, so units without tracts drop out"""
+        self.__init__(tracts)
+    
+    def _compute_nri(self):
+        nri = list(map(operator.truediv, map(operator.mul, self.mineral_acres, self.royalty_rate),
+                       self.drilling_unit_gross_acres))
+        unit_nri = [0.0] * len(self.units)
+        for position, value in zip(self.unit_index, nri):
+            unit_nri[position] += value
+        self._total_nri = sum(nri)
+        self._unit_nri = unit_nri
+    
+    @property
+    def total_nri(self) -> float:
+        """Sum of tract NRI across every unit (cached)"""
+        if self._total_nri is None:
+            self._compute_nri()
+        return self._total_nri
+    
+    def unit_nri(self, unit_name: Optional[str]) -> float:
+        """Sum of tract NRI in one unit (cached; 0.0 for an unknown unit)"""
+        if self._unit_nri is None:
+            self._compute_nri()
+        position = self._unit_positions.get(unit_name)
+        return 0.0 if position is None else self._unit_nri[position]
+    
+    def nri_by_unit(self) -> Dict[Optional[str], float]:
+        """NRI per unit_name, in first-seen order"""
+        if self._unit_nri is None:
+            self._compute_nri()
+        return dict(zip(self.units, self._unit_nri))
+    
+    def unit_tracts(self, unit_name: Optional[str]) -> List[Tract]:
+        """Tracts in one unit, in chain order"""
+        position = self._unit_positions.get(unit_name)
+        return [self[i] for i, unit in enumerate(self.unit_index) if unit == position]
+
+
 @dataclass
 class DealInputs:
     """All inputs required for a deal evaluation"""
@@ -33,15 +233,15 @@ class DealInputs:
     basin: str  # Appalachia, Permian, Haynesville, Oklahoma STACK/SCOOP
     type_curve_id: str
     
-    # Mineral Interest Tracts (new structure)
-    tracts: List[Tract] = field(default_factory=list)
+    # Mineral Interest Tracts (a list of Tract is converted to a TractLedger)
+    tracts: TractLedger = field(default_factory=TractLedger)
     
     # Well & Land
     gross_locations: float = 1.0
     lateral_length_ft: float = 10000  # feet
     
     # Participation (optional additional interests beyond tract NRI)
-    participation_wi: float = 0.0  # optional additional WI %
+    participation_wi: float = 0.0  # optional additional WI % (cost share when cost_bearing)
     participation_nri: float = 0.0  # optional additional NRI %
     
     # Production (EUR per well)
@@ -72,7 +272,7 @@ class DealInputs:
     #   - oil_price_per_bbl is $/Bbl (volumes in MBbls)
     oil_price_per_bbl: float = 61.0  # $/Bbl
     gas_price_per_mcf: float = 3.68  # $/MMcf (when using type curves)
-    ngl_price_per_bbl: float = 0.0  # auto-calc: 33% of WTI
+    ngl_price_per_bbl: float = 0.0  # 0.0 = ngl_differential_pct_wti of oil_price_per_bbl (see ngl_price)
     
     # Price Differentials (same units as prices)
     oil_differential_per_bbl: float = 0.0  # $/Bbl
@@ -87,6 +287,9 @@ class DealInputs:
     variable_opex_oil_per_bbl: float = 0.0
     variable_opex_gas_per_mcf: float = 0.15
     variable_opex_water_per_bblw: float = 0.0
+    # Produced water (drives water opex): bbl per bbl of oil and per unit of gas volume
+    water_yield_bbls_per_bbl_oil: float = 0.0
+    water_yield_bbls_per_mmcf: float = 0.0
     
     # Gas Processing & Transportation
     gas_processing_per_mcf: float = 1.79  # GP&T cost
@@ -103,6 +306,9 @@ class DealInputs:
     duct_delay_months: int = 1
     permit_delay_months: int = 12
     development_pace_years: int = 4
+    # If True: develop gross_locations wells on a spud schedule over
+    # development_pace_years (unit level) instead of the single-well ramp
+    unit_development: bool = False
     
     # Asset Type
     asset_type: str = "PUD"  # PUD, DUC, PDP, Permit
@@ -112,7 +318,8 @@ class DealInputs:
     production_risk: float = 1.0  # 100%
     
     # Cost Bearing
-    # If True: We bear all capex and opex (single well basis)
+    # If True: working interest - we bear participation_wi of capex and opex
+    #   (all of it when participation_wi is 0) for every well on the schedule
     # If False: Operator bears costs, we get net revenue only (lease/royalty basis)
     cost_bearing: bool = False
     
@@ -138,16 +345,39 @@ class DealInputs:
     discount_rates: List[float] = field(default_factory=lambda: [0.0, 0.05, 0.075, 0.10, 0.125, 0.15, 0.175, 0.20, 0.25, 0.30])
     base_date: datetime = field(default_factory=datetime.now)
     
+    # Economic Limit
+    # If True: cut the cash flows after the last month whose operating cash flow
+    # (before acquisition cost, upfront G&A and capex) exceeds the threshold
+    economic_limit: bool = False
+    economic_limit_threshold: float = 0.0  # $/month
+    
     @property
     def total_nri(self) -> float:
         """Calculate total NRI across all tracts plus participation"""
-        tract_nri = sum(tract.nri for tract in self.tracts)
-        return tract_nri + self.participation_nri
+        return self.tracts.total_nri + self.participation_nri
     
-    def __post_init__(self):
-        """Calculate derived fields"""
+    @property
+    def ngl_price(self) -> float:
+        """
+        NGL price the stages use (ngl_price_at the deal's oil price). Derived
+        here rather than stored, so replace()/update() of the oil price or
+        percentage re-derive it.
+        """
+        return self.ngl_price_at(self.oil_price_per_bbl)
+    
+    def ngl_price_at(self, oil_price):
+        """
+        NGL price at an oil price (a float, or a numpy array of monthly prices):
+        ngl_price_per_bbl, or ngl_differential_pct_wti of oil_price when it is 0.0
+        """
         if self.ngl_price_per_bbl == 0.0:
-            self.ngl_price_per_bbl = self.oil_price_per_bbl * self.ngl_differential_pct_wti
+            return oil_price * self.ngl_differential_pct_wti
+        return self.ngl_price_per_bbl
+    
+    def __post_init__(self):
+        """Normalize tracts to a TractLedger"""
+        if not isinstance(self.tracts, TractLedger):
+            self.tracts = TractLedger(self.tracts)
 
 
 @dataclass
@@ -186,6 +416,366 @@ class AnnualCashFlow:
     net_cash_flow: float = 0.0
 
 
+# Column layout of the cash-flow ledger (one column per AnnualCashFlow field)
+CASH_FLOW_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(AnnualCashFlow))
+_INT_CASH_FLOW_FIELDS = ("year", "month")
+
+
+class CashFlowRow:
+    """
+    Lazy view of one month in a CashFlowLedger.
+    Reads like an AnnualCashFlow (cf.month, cf.net_cash_flow, ...) without
+    materializing a per-month object.
+    """
+    __slots__ = ("_ledger", "_index")
+    
+    def __init__(self, ledger: 'CashFlowLedger', index: int):
+        self._ledger = ledger
+        self._index = index
+    
+    def __getattr__(self, name):
+        try:
+            column = self._ledger.columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+        return column[self._index]
+    
+    def to_dataclass(self) -> AnnualCashFlow:
+        """Materialize this row as an AnnualCashFlow"""
+        return AnnualCashFlow(**{name: self._ledger.columns[name][self._index] for name in CASH_FLOW_FIELDS})
+    
+    def __repr__(self) -> str:
+        return f"CashFlowRow(month={self.month}, net_cash_flow={self.net_cash_flow})"
+
+
+class CashFlowLedger:
+    """
+    Struct-of-arrays monthly cash flows.
+    One contiguous array per AnnualCashFlow field ('d' for dollars/volumes,
+    'l' for year/month), so whole-column reductions like sum(ledger.capex)
+    never touch per-month objects. Iterating or indexing yields CashFlowRow views.
+    """
+    
+    def __init__(self, length: int = 0):
+        self.columns: Dict[str, array] = {
+            name: array('l' if name in _INT_CASH_FLOW_FIELDS else 'd', [0]) * length
+            for name in CASH_FLOW_FIELDS
+        }
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Sequence[float]]) -> 'CashFlowLedger':
+        """
+        Build a ledger from whole columns (missing columns are zero-filled).
+        Arrays with the matching typecode are adopted without copying.
+        """
+        length = len(columns["month"])
+        ledger = cls(length)
+        adopted = set()
+        for name, values in columns.items():
+            if len(values) != length:
+                raise ValueError(f"Column {name} has {len(values)} rows, expected {length}")
+            typecode = ledger.columns[name].typecode
+            if isinstance(values, array) and values.typecode == typecode and id(values) not in adopted:
+                ledger.columns[name] = values
+                adopted.add(id(values))
+            else:
+                ledger.columns[name] = array(typecode, values)
+        return ledger
+    
+    def append(self, **values: float):
+        """Append one month; fields not given are zero"""
+        for name, column in self.columns.items():
+            column.append(values.get(name, 0))
+    
+    def column(self, name: str) -> array:
+        """Return the contiguous array for one field"""
+        return self.columns[name]
+    
+    def __getattr__(self, name):
+        # Column access: ledger.net_cash_flow -> array('d', ...)
+        columns = self.__dict__.get("columns")
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+    
+    def __len__(self) -> int:
+        return len(self.columns["month"])
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CashFlowRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("cash flow index out of range")
+        return CashFlowRow(self, index)
+    
+    def __iter__(self) -> Iterator[CashFlowRow]:
+        for i in range(len(self)):
+            yield CashFlowRow(self, i)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column buffers"""
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+
+# Process-wide cache of discount-factor vectors, keyed by (rate, horizon, convention).
+# Every deal discounts at the same handful of rates, so the pow() work is shared.
+DISCOUNT_CONVENTIONS = ("annual", "mid_month")
+DISCOUNT_CACHE_MAX_ENTRIES = 256
+_DISCOUNT_CACHE: 'OrderedDict[Tuple[float, int, str], array]' = OrderedDict()
+_DISCOUNT_CACHE_LOCK = threading.Lock()
+
+
+def discount_factors(rate: float, horizon: int, convention: str = "annual") -> array:
+    """
+    Discount factor for months 0..horizon-1 at an annual rate.
+    
+    Conventions:
+        annual: (1 + rate)^(-month/12), as used by MineralEvaluation
+        mid_month: (1 + rate)^(-(month + 0.5)/12)
+    
+    Returned arrays are shared between callers - do not modify them.
+    """
+    key = (rate, horizon, convention)
+    with _DISCOUNT_CACHE_LOCK:
+        factors = _DISCOUNT_CACHE.get(key)
+        if factors is not None:
+            _DISCOUNT_CACHE.move_to_end(key)
+            return factors
+    
+    if convention == "annual":
+        offset = 0.0
+    elif convention == "mid_month":
+        offset = 0.5
+    else:
+        raise ValueError(f"Unknown discount convention: {convention}")
+    factors = array('d', [(1 + rate) ** (-(month + offset) / 12) for month in range(horizon)])
+    
+    with _DISCOUNT_CACHE_LOCK:
+        _DISCOUNT_CACHE[key] = factors
+        while len(_DISCOUNT_CACHE) > DISCOUNT_CACHE_MAX_ENTRIES:
+            _DISCOUNT_CACHE.popitem(last=False)  # Evict least recently used
+    return factors
+
+
+def npv_at_rates(cash_flows: Sequence[float], rates: Sequence[float], convention: str = "annual") -> List[float]:
+    """NPV at each rate: the discount-factor table times the cash-flow vector"""
+    horizon = len(cash_flows)
+    return [sum(map(operator.mul, cash_flows, discount_factors(rate, horizon, convention))) for rate in rates]
+
+
+def clear_discount_cache():
+    """Clear the discount-factor cache."""
+    with _DISCOUNT_CACHE_LOCK:
+        _DISCOUNT_CACHE.clear()
+
+
+# Ledger column summed into each summary() total
+SUMMARY_TOTAL_COLUMNS = {
+    "total_capex": "capex",
+    "total_revenue": "total_revenue",
+    "total_opex": "total_opex",
+    "total_tax": "total_tax",
+}
+
+
+@dataclass
+class CashFlowMetrics:
+    """NPV at each rate, MoM, payback and summary totals of one ledger"""
+    npv_by_rate: Dict[float, float]
+    total_inflow: float
+    total_outflow: float  # Magnitude of the negative months
+    payback_months: Optional[int]  # First month cumulative cash flow is non-negative
+    totals: Dict[str, float]  # SUMMARY_TOTAL_COLUMNS keys plus cumulative_cash_flow
+    
+    @property
+    def mom(self) -> Optional[float]:
+        return self.total_inflow / self.total_outflow if self.total_outflow > 0 else None
+
+
+def scan_cash_flows(columns: Dict[str, Sequence[float]], rates: Sequence[float],
+                    convention: str = "annual") -> CashFlowMetrics:
+    """
+    Every per-deal metric from one pass over the net cash flow.
+    
+    The running total gives payback and cumulative cash flow and the sign split
+    gives MoM in the same loop; NPVs are dot products against the shared
+    discount-factor table and the remaining totals plain column sums, both of
+    which run in C. Results are bit-identical to summing each metric separately.
+    """
+    net_cash_flow = columns["net_cash_flow"]
+    inflow = outflow = cumulative = 0.0
+    payback = None
+    for month, value in enumerate(net_cash_flow):
+        if value > 0:
+            inflow += value
+        elif value < 0:
+            outflow += value
+        cumulative += value
+        if payback is None and cumulative >= 0:
+            payback = month
+    
+    totals = {key: sum(columns[name]) for key, name in SUMMARY_TOTAL_COLUMNS.items()}
+    totals["cumulative_cash_flow"] = cumulative
+    return CashFlowMetrics(
+        npv_by_rate=dict(zip(rates, npv_at_rates(net_cash_flow, rates, convention))),
+        total_inflow=inflow,
+        total_outflow=abs(outflow),
+        payback_months=payback,
+        totals=totals,
+    )
+
+
+@dataclass
+class HorizonMetrics:
+    """NPV for every analysis-period cutoff, IRR at selected cutoffs"""
+    discount_rates: List[float]
+    cumulative_npv: Dict[float, array]  # [m] = NPV of months 0..m-1, m = 0..horizon
+    irr_by_years: Dict[int, Optional[float]]  # Cutoff in years -> IRR of that period
+    
+    def npv(self, years: int, rate: float) -> float:
+        """NPV at a rate counting only the first `years` years"""
+        cumulative = self.cumulative_npv[rate]
+        return cumulative[min(12 * years, len(cumulative) - 1)]
+    
+    def npv_by_years(self, rate: float) -> List[float]:
+        """NPV at a rate for cutoffs of 1, 2, ... whole years"""
+        cumulative = self.cumulative_npv[rate]
+        return [cumulative[month] for month in range(12, len(cumulative), 12)]
+
+
+def cumulative_npv(cash_flows: Sequence[float], rates: Sequence[float],
+                   convention: str = "annual") -> Dict[float, array]:
+    """Running discounted sums per rate: [m] is the NPV of months 0..m-1 (one pass per rate)"""
+    horizon = len(cash_flows)
+    return {
+        rate: array('d', accumulate(map(operator.mul, cash_flows, discount_factors(rate, horizon, convention)),
+                                    initial=0.0))
+        for rate in rates
+    }
+
+
+def interpolated_irr(npv_by_rate: Dict[float, float]) -> Optional[float]:
+    """
+    Rate where NPV crosses zero, interpolated between the adjacent discount
+    rates that bracket it (None when no pair of rates does). A start point
+    for solve_irr, not an IRR.
+    """
+    points = sorted(npv_by_rate.items())
+    for (low_rate, low_npv), (high_rate, high_npv) in zip(points, points[1:]):
+        if low_npv == 0:
+            return low_rate
+        if (low_npv > 0) != (high_npv > 0):
+            return low_rate + (high_rate - low_rate) * low_npv / (low_npv - high_npv)
+    return None
+
+
+# IRR search: NPV is solved in the monthly discount factor v = (1 + rate)^(-1/12),
+# where NPV(v) = sum(cf[m] * v^m) is a polynomial evaluated by Horner's rule
+IRR_LOW = 0.0
+IRR_HIGH = 10.0  # 1000%
+IRR_EXPANDED_HIGHS = (50.0, 100.0, 500.0, 1000.0)
+IRR_NPV_TOLERANCE = 1e-6
+IRR_MAX_ITERATIONS = 100
+
+
+@dataclass
+class IrrSolution:
+    """Result of an IRR solve"""
+    rate: Optional[float]  # None unless converged
+    converged: bool
+    iterations: int
+    message: str  # "converged", "no sign change", "did not converge"
+
+
+def monthly_discount_factor(rate: float) -> float:
+    """One month of discounting at an annual rate: (1 + rate)^(-1/12)"""
+    return (1 + rate) ** (-1 / 12)
+
+
+def npv_and_derivative(cash_flows: Sequence[float], v: float) -> Tuple[float, float]:
+    """
+    NPV and dNPV/dv at monthly discount factor v, where cash_flows[m] falls
+    in month m. One Horner pass, no pow() per month.
+    """
+    npv = 0.0
+    derivative = 0.0
+    for cash_flow in reversed(cash_flows):
+        derivative = derivative * v + npv
+        npv = npv * v + cash_flow
+    return npv, derivative
+
+
+def solve_irr(cash_flows: Sequence[float], tolerance: float = IRR_NPV_TOLERANCE,
+              max_iterations: int = IRR_MAX_ITERATIONS, guess: Optional[float] = None) -> IrrSolution:
+    """
+    Solve for the annual rate where NPV = 0.
+    
+    Brackets the root between 0% and 1000% (expanding to 100,000% when NPV is
+    still positive), then runs Newton steps on the monthly discount factor,
+    falling back to bisection whenever a step leaves the bracket.
+    
+    Args:
+        cash_flows: Net cash flow per month, month 0 first
+        tolerance: Stop when |NPV| falls below this
+        max_iterations: Newton/bisection step limit
+        guess: Starting rate for Newton (e.g. the IRR of a neighbouring cash-flow
+            cutoff); ignored when outside the bracket
+    
+    Returns:
+        IrrSolution (rate is None when there is no sign change or no convergence)
+    """
+    # Bracket in discount-factor space: v_rate_low = 1 at 0%, smaller v = higher rate
+    v_a = monthly_discount_factor(IRR_LOW)
+    v_b = monthly_discount_factor(IRR_HIGH)
+    npv_a = npv_and_derivative(cash_flows, v_a)[0]
+    npv_b = npv_and_derivative(cash_flows, v_b)[0]
+    
+    if npv_a * npv_b > 0:
+        if npv_a < 0:
+            return IrrSolution(None, False, 0, "no sign change")
+        # NPV positive at 1000%: IRR is very high, expand the range
+        for test_high in IRR_EXPANDED_HIGHS:
+            v_b = monthly_discount_factor(test_high)
+            npv_b = npv_and_derivative(cash_flows, v_b)[0]
+            if npv_b < 0:
+                break
+        else:
+            return IrrSolution(None, False, 0, "no sign change")
+    
+    if npv_a == 0:
+        return IrrSolution(IRR_LOW, True, 0, "converged")
+    
+    # Secant guess inside the bracket, then safeguarded Newton
+    lo, npv_lo = v_a, npv_a
+    hi = v_b
+    v = v_a - npv_a * (v_a - v_b) / (npv_a - npv_b)
+    if guess is not None and guess > -1 and min(lo, hi) < monthly_discount_factor(guess) < max(lo, hi):
+        v = monthly_discount_factor(guess)
+    for iteration in range(1, max_iterations + 1):
+        npv, derivative = npv_and_derivative(cash_flows, v)
+        if abs(npv) < tolerance:
+            return IrrSolution(v ** -12 - 1, True, iteration, "converged")
+        
+        # Keep the root bracketed between lo (same sign as npv_a) and hi
+        if (npv > 0) == (npv_lo > 0):
+            lo, npv_lo = v, npv
+        else:
+            hi = v
+        
+        step = npv / derivative if derivative != 0 else 0.0
+        next_v = v - step
+        if derivative == 0 or not min(lo, hi) < next_v < max(lo, hi):
+            next_v = (lo + hi) / 2
+        if abs(next_v - v) <= 1e-15 * v:
+            return IrrSolution(next_v ** -12 - 1, True, iteration, "converged")
+        v = next_v
+    
+    return IrrSolution(None, False, max_iterations, "did not converge")
+
+
 class ProductionDecline:
     """Production decline model"""
     
@@ -206,317 +796,787 @@ class ProductionDecline:
         return q0 / (1 + di * t)
     
     @staticmethod
-    def eur_to_initial_rate(eur_total, di, decline_type="exponential", well_life_years=50, b=0.5):
+    def eur_to_initial_rate(eur_total, di, decline_type="exponential", well_life_years=50, b=0.5,
+                            terminal_decline_rate=None):
         """
         Convert EUR (cumulative) to initial daily production rate.
-        Uses analytical formula for exponential decline, iterative for others.
+        Closed form for every decline type (see arps.py): cumulative production
+        is linear in q0, so q0 = EUR / cumulative of a unit-rate curve.
         
-        EUR = integral of q(t) dt from 0 to T
-        For exponential: Q(T) = q0/di * (1 - exp(-di*T))
-        So: q0 = EUR * di / (1 - exp(-di*T))
-        """
-        well_life = well_life_years  # years
+        EUR = integral of q(t) dt from 0 to T (q daily, T in days)
+        For exponential: Q(T) = 365 × q0/di × (1 - exp(-di*T_years))
         
-        if decline_type == "exponential":
-            # Analytical solution
-            if di > 0:
-                factor = 1 - math.exp(-di * well_life)
-                if factor > 0:
-                    q0 = eur_total * di / factor
-                else:
-                    q0 = eur_total / well_life / 365  # Fallback
+        terminal_decline_rate switches hyperbolic decline to exponential once
+        the instantaneous decline falls to it (modified hyperbolic).
+        """
+        curve = ArpsDecline.from_eur(
+            eur_total, di, decline_exponent(decline_type, b), well_life_years, terminal_decline_rate,
+        )
+        return curve.qi
+
+
+# Decline-curve profiles, shared by every deal with the same decline parameters
+DECLINE_PROFILE_CACHE_MAX_ENTRIES = 256
+_DECLINE_PROFILE_CACHE: 'OrderedDict[Tuple[float, float, float, Optional[float], int], array]' = OrderedDict()
+_DECLINE_PROFILE_CACHE_LOCK = threading.Lock()
+
+
+def decline_profile(qi: float, di: float, b: float, terminal_decline: Optional[float], months: int) -> array:
+    """
+    Monthly volumes of an Arps decline curve (see arps.ArpsDecline), cached
+    by parameter tuple. The returned array is shared; do not modify it.
+    """
+    key = (qi, di, b, terminal_decline, months)
+    with _DECLINE_PROFILE_CACHE_LOCK:
+        profile = _DECLINE_PROFILE_CACHE.get(key)
+        if profile is not None:
+            _DECLINE_PROFILE_CACHE.move_to_end(key)
+            return profile
+    
+    profile = ArpsDecline(qi, di, b, terminal_decline).monthly_volumes(months)
+    with _DECLINE_PROFILE_CACHE_LOCK:
+        _DECLINE_PROFILE_CACHE[key] = profile
+        while len(_DECLINE_PROFILE_CACHE) > DECLINE_PROFILE_CACHE_MAX_ENTRIES:
+            _DECLINE_PROFILE_CACHE.popitem(last=False)  # Evict least recently used
+    return profile
+
+
+def clear_decline_profile_cache():
+    """Clear the decline-profile cache."""
+    with _DECLINE_PROFILE_CACHE_LOCK:
+        _DECLINE_PROFILE_CACHE.clear()
+
+
+def production_curves(inputs: DealInputs) -> Tuple[Sequence[float], Sequence[float]]:
+    """
+    Per-well monthly gas and oil curves that the ramp/delay logic indexes into.
+    
+    Type-curve volumes win when provided. Otherwise the curves come from the
+    decline fields: initial_*_rate (per day) declined at initial_decline_rate
+    (nominal annual) with decline_curve_type / hyperbolic_exponent, switching to
+    terminal_decline_rate for hyperbolic and harmonic decline. Decline volumes
+    are in the rate's unit (Mcf and Bbl per month). No type curve and no
+    initial rates gives empty curves (no production).
+    """
+    if inputs.monthly_gross_gas_volumes:
+        return inputs.monthly_gross_gas_volumes, inputs.monthly_gross_oil_volumes
+    if inputs.initial_gas_rate_mcf_per_day <= 0 and inputs.initial_oil_rate_bbl_per_day <= 0:
+        return [], []
+    
+    months = inputs.analysis_years * 12
+    b = decline_exponent(inputs.decline_curve_type, inputs.hyperbolic_exponent)
+    di = inputs.initial_decline_rate
+    terminal = inputs.terminal_decline_rate
+    return (
+        decline_profile(inputs.initial_gas_rate_mcf_per_day, di, b, terminal, months),
+        decline_profile(inputs.initial_oil_rate_bbl_per_day, di, b, terminal, months),
+    )
+
+
+# Cash-flow stages, in dependency order. Each stage reads DealInputs fields and
+# upstream columns and returns its own columns, so MineralEvaluation.update()
+# can recompute only the stages a changed field feeds.
+CASH_FLOW_STAGES: Tuple[str, ...] = ("timeline", "volumes", "net_volumes", "revenue", "costs", "tax", "fees", "net_cash_flow")
+
+# DealInputs fields read directly by each stage
+STAGE_FIELDS: Dict[str, FrozenSet[str]] = {
+    "timeline": frozenset({"analysis_years"}),
+    "volumes": frozenset({
+        "analysis_years", "monthly_gross_gas_volumes", "monthly_gross_oil_volumes",
+        "undeveloped_delay_months", "undeveloped_timing_years", "production_risk",
+        "gas_shrink_factor", "ngl_yield_bbls_per_mmcf",
+        "initial_gas_rate_mcf_per_day", "initial_oil_rate_bbl_per_day", "decline_curve_type",
+        "initial_decline_rate", "hyperbolic_exponent", "terminal_decline_rate",
+        "unit_development", "gross_locations", "development_pace_years",
+        "permit_delay_months", "duct_delay_months",
+    }),
+    "net_volumes": frozenset({"tracts", "participation_nri"}),
+    "revenue": frozenset({
+        "gas_price_per_mcf", "gas_differential_per_mcf", "btu_adjustment",
+        "oil_price_per_bbl", "oil_differential_per_bbl", "ngl_price_per_bbl", "ngl_differential_pct_wti",
+    }),
+    "costs": frozenset({
+        "cost_bearing", "is_cost_bearing_lease", "gas_processing_per_mcf",
+        "fixed_opex_per_month", "variable_opex_oil_per_bbl", "variable_opex_gas_per_mcf",
+        "variable_opex_water_per_bblw", "water_yield_bbls_per_bbl_oil", "water_yield_bbls_per_mmcf",
+        "drilling_completion_capex", "lateral_length_ft", "spud_to_sales_months",
+        "undeveloped_delay_months", "analysis_years", "participation_wi",
+    }),
+    "tax": frozenset({
+        "oil_price_per_bbl", "gas_price_per_mcf", "ngl_price_per_bbl", "ngl_differential_pct_wti",
+        "severance_tax_oil_pct", "severance_tax_gas_pct", "severance_tax_ngl_pct", "ad_valorem_tax_pct",
+    }),
+    "fees": frozenset({"acquisition_cost", "upfront_ga_fees", "annual_ga", "analysis_years"}),
+    "net_cash_flow": frozenset(),
+}
+
+# Upstream stages whose columns each stage reads
+STAGE_UPSTREAM: Dict[str, Tuple[str, ...]] = {
+    "timeline": (),
+    "volumes": (),
+    "net_volumes": ("volumes",),
+    "revenue": ("net_volumes",),
+    "costs": ("volumes", "net_volumes"),
+    "tax": ("net_volumes", "revenue"),
+    "fees": (),
+    "net_cash_flow": ("revenue", "costs", "tax", "fees"),
+}
+
+# Fields that only affect the metrics computed from net cash flow
+METRIC_FIELDS: FrozenSet[str] = frozenset({"discount_rates"})
+
+# Fields that change where the ledger is cut, but no stage output
+LEDGER_FIELDS: FrozenSet[str] = frozenset({"economic_limit", "economic_limit_threshold"})
+
+
+@dataclass
+class TruncatedTail:
+    """Rows dropped by the economic limit, totalled so results stay auditable"""
+    first_month: int
+    months: int
+    net_cash_flow: float
+    operating_cash_flow: float
+    total_revenue: float
+    gross_gas_mcf: float
+    gross_oil_bbl: float
+
+
+def operating_cash_flow(columns: Dict[str, Sequence[float]]) -> List[float]:
+    """Net cash flow before the one-time items: acquisition cost, upfront G&A and capex"""
+    return [
+        net + acquisition + ga + capex
+        for net, acquisition, ga, capex in zip(
+            columns["net_cash_flow"], columns["acquisition_cost"], columns["ga_fees"], columns["capex"],
+        )
+    ]
+
+
+def economic_limit_month(operating: Sequence[float], threshold: float = 0.0) -> int:
+    """Last month whose operating cash flow exceeds threshold (-1 if none)"""
+    for month in range(len(operating) - 1, -1, -1):
+        if operating[month] > threshold:
+            return month
+    return -1
+
+
+def dirty_stages(changed_fields: Iterable[str]) -> List[str]:
+    """Stages that must rerun after the given DealInputs fields change, in run order"""
+    changed_fields = set(changed_fields)
+    dirty = set()
+    for stage in CASH_FLOW_STAGES:
+        if STAGE_FIELDS[stage] & changed_fields or any(up in dirty for up in STAGE_UPSTREAM[stage]):
+            dirty.add(stage)
+    return [stage for stage in CASH_FLOW_STAGES if stage in dirty]
+
+
+def _zeros(horizon: int) -> array:
+    return array('d', [0.0]) * horizon
+
+
+def timeline_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Month index and year of each row"""
+    return timeline_columns(range(inputs.analysis_years * 12))
+
+
+def timeline_columns(months: range) -> Dict[str, array]:
+    """Timeline stage for a run of months"""
+    return {
+        "year": array('l', [month // 12 for month in months]),
+        "month": array('l', months),
+    }
+
+
+# Ramped and delayed volume profiles (before production risk), shared by every
+# deal (and tract) on the same curve and timing
+PROFILE_CACHE_MAX_ENTRIES = 512
+_PROFILE_CACHE: 'OrderedDict[Tuple, Tuple[array, array]]' = OrderedDict()
+_PROFILE_CACHE_LOCK = threading.Lock()
+_PROFILE_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+def profile_key(inputs: DealInputs) -> Tuple:
+    """
+    (curve id, delay, ramp, horizon) plus the curve contents, so two deals
+    that reuse a type_curve_id with different volumes never collide. Unit
+    development adds its spud schedule. production_risk is applied after the
+    lookup, so risk and EUR-multiplier cases share one entry.
+    """
+    gas_curve, oil_curve = production_curves(inputs)
+    return (
+        inputs.type_curve_id,
+        inputs.undeveloped_delay_months,
+        inputs.undeveloped_timing_years,
+        inputs.analysis_years * 12,
+        array('d', gas_curve).tobytes(),
+        array('d', oil_curve).tobytes(),
+        tuple(spud_schedule(inputs)) if inputs.unit_development else None,
+    )
+
+
+def spud_schedule(inputs: DealInputs) -> List[Tuple[int, float]]:
+    """
+    Unit development schedule as (first production month, wells) pairs in
+    month order.
+    
+    ceil(gross_locations) wells spud evenly over development_pace_years, the
+    first one permit_delay_months after undeveloped_delay_months; each comes
+    online duct_delay_months after spud. A fractional gross_locations makes
+    the last well a partial one (e.g. 2.5 = two wells plus half a well).
+    """
+    wells = math.ceil(inputs.gross_locations)
+    if wells <= 0:
+        return []
+    pace_months = inputs.development_pace_years * 12
+    first_online = inputs.undeveloped_delay_months + inputs.permit_delay_months + inputs.duct_delay_months
+    schedule: Dict[int, float] = {}
+    for well in range(wells):
+        weight = min(1.0, inputs.gross_locations - well)
+        month = first_online + (well * pace_months) // wells
+        schedule[month] = schedule.get(month, 0.0) + weight
+    return sorted(schedule.items())
+
+
+def convolve_schedule(curve: Sequence[float], schedule: Sequence[Tuple[int, float]], horizon: int) -> array:
+    """
+    Unit volumes: the per-well curve convolved with the spud schedule.
+    
+    The schedule is sparse (one entry per spud month), so each entry adds a
+    shifted, scaled copy of the curve: O(spud months × horizon).
+    """
+    volumes = [0.0] * horizon
+    full_curve = list(curve)
+    for month, wells in schedule:
+        if month >= horizon:
+            break
+        end = min(horizon, month + len(full_curve))
+        shifted = full_curve[:end - month] if wells == 1.0 else [value * wells for value in full_curve[:end - month]]
+        volumes[month:end] = map(operator.add, volumes[month:end], shifted)
+    return array('d', volumes)
+
+
+def _build_volume_profile(inputs: DealInputs) -> Tuple[array, array]:
+    """
+    Gross gas/oil per month after ramp and delay, before production risk (loop
+    implementation). With unit_development the ramp is replaced by the
+    spud-schedule convolution.
+    """
+    horizon = inputs.analysis_years * 12
+    gross_gas = _zeros(horizon)
+    gross_oil = _zeros(horizon)
+    
+    gas_curve, oil_curve = production_curves(inputs)
+    if gas_curve and inputs.unit_development:
+        schedule = spud_schedule(inputs)
+        gross_gas = convolve_schedule(gas_curve, schedule, horizon)
+        if oil_curve:
+            gross_oil = convolve_schedule(oil_curve, schedule, horizon)
+    elif gas_curve:
+        ramp_duration_months = int(inputs.undeveloped_timing_years * 12)
+        for month in range(horizon):
+            # Ramp starts at undeveloped_delay_months (month when first well spuds)
+            months_since_undeveloped = month - inputs.undeveloped_delay_months
+            if months_since_undeveloped < 0:
+                # Before any drilling
+                continue
+            if months_since_undeveloped < ramp_duration_months:
+                # During ramp: (month_index / ramp_duration) × peak_production
+                ramp_factor = (months_since_undeveloped + 1) / ramp_duration_months
+                gross_gas[month] = gas_curve[0] * ramp_factor
             else:
-                q0 = eur_total / well_life / 365
-        else:
-            # Iterative approach for hyperbolic/harmonic
-            q0_guess = eur_total / (well_life * 365)
-            
-            for iteration in range(20):
-                cumulative = 0.0
-                for day in range(well_life * 365):
-                    years = day / 365.0
-                    if decline_type == "hyperbolic":
-                        rate = ProductionDecline.hyperbolic_decline(q0_guess, di, b, years)
-                    else:
-                        rate = ProductionDecline.harmonic_decline(q0_guess, di, years)
-                    cumulative += rate
-                
-                # Adjust q0 to match EUR
-                if cumulative > 0:
-                    ratio = eur_total / cumulative
-                    q0_guess = q0_guess * ratio
-                    # Stop if converged
-                    if abs(ratio - 1.0) < 0.001:
-                        break
-            
-            q0 = q0_guess
-        
-        return q0
+                # After ramp: use type curve directly
+                tc_month_index = int(months_since_undeveloped - ramp_duration_months)
+                if tc_month_index < len(gas_curve):
+                    gross_gas[month] = gas_curve[tc_month_index]
+                if oil_curve and tc_month_index < len(oil_curve):
+                    gross_oil[month] = oil_curve[tc_month_index]
+    return gross_gas, gross_oil
+
+
+def volume_profile(inputs: DealInputs,
+                   build: Callable[[DealInputs], Tuple[array, array]] = _build_volume_profile) -> Tuple[array, array]:
+    """
+    Gross gas/oil volume profile after production risk. The unrisked profile
+    is cached process-wide by profile_key and scaled on the way out.
+    
+    Returns fresh copies, so callers may keep or modify them. `build` computes
+    a missing unrisked profile (the NumPy backend passes its own).
+    """
+    key = profile_key(inputs)
+    with _PROFILE_CACHE_LOCK:
+        profile = _PROFILE_CACHE.get(key)
+        if profile is not None:
+            _PROFILE_CACHE.move_to_end(key)
+            _PROFILE_CACHE_STATS["hits"] += 1
+    
+    if profile is None:
+        profile = build(inputs)
+        with _PROFILE_CACHE_LOCK:
+            _PROFILE_CACHE_STATS["misses"] += 1
+            _PROFILE_CACHE[key] = profile
+            while len(_PROFILE_CACHE) > PROFILE_CACHE_MAX_ENTRIES:
+                _PROFILE_CACHE.popitem(last=False)  # Evict least recently used
+    risk = inputs.production_risk
+    return array('d', [gas * risk for gas in profile[0]]), array('d', [oil * risk for oil in profile[1]])
+
+
+def profile_cache_stats() -> Dict[str, int]:
+    """Hit/miss counts and size of the volume-profile cache"""
+    with _PROFILE_CACHE_LOCK:
+        return {**_PROFILE_CACHE_STATS, "entries": len(_PROFILE_CACHE)}
+
+
+def clear_profile_cache():
+    """Clear the volume-profile cache and its counters."""
+    with _PROFILE_CACHE_LOCK:
+        _PROFILE_CACHE.clear()
+        _PROFILE_CACHE_STATS.update(hits=0, misses=0)
+
+
+def volumes_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Gross gas/oil after ramp, delay and risk; shrunk gas and gross NGL"""
+    gross_gas, gross_oil = volume_profile(inputs)
+    return volume_columns(inputs, gross_gas, gross_oil)
+
+
+def volume_columns(inputs: DealInputs, gross_gas: array, gross_oil: array) -> Dict[str, array]:
+    """Volumes stage from (a window of) the gross gas/oil profile"""
+    # NGL from shrunk gas
+    shrunk_gas = array('d', [gas * inputs.gas_shrink_factor for gas in gross_gas])
+    ngl_yield = inputs.ngl_yield_bbls_per_mmcf
+    gross_ngl = array('d', [gas * ngl_yield / 1_000_000 for gas in shrunk_gas])
+    
+    return {
+        "gross_gas_mcf": gross_gas,
+        "gross_oil_bbl": gross_oil,
+        "gross_ngl_bbl": gross_ngl,
+        "shrunk_gas_mcf": shrunk_gas,
+    }
+
+
+def net_volumes_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Volumes net to interest (total NRI includes tracts + participation)"""
+    total_nri = inputs.total_nri
+    return {
+        "net_gas_mcf": array('d', [gas * total_nri for gas in columns["gross_gas_mcf"]]),
+        "net_oil_bbl": array('d', [oil * total_nri for oil in columns["gross_oil_bbl"]]),
+        "net_ngl_bbl": array('d', [ngl * total_nri for ngl in columns["gross_ngl_bbl"]]),
+    }
+
+
+def revenue_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Revenue by product at realized prices"""
+    gas_price = inputs.gas_price_per_mcf + inputs.gas_differential_per_mcf
+    btu_adjustment = inputs.btu_adjustment
+    oil_price = inputs.oil_price_per_bbl + inputs.oil_differential_per_bbl
+    ngl_price = inputs.ngl_price
+    
+    gas_revenue = array('d', [gas * gas_price * btu_adjustment for gas in columns["net_gas_mcf"]])
+    oil_revenue = array('d', [oil * oil_price for oil in columns["net_oil_bbl"]])
+    ngl_revenue = array('d', [ngl * ngl_price for ngl in columns["net_ngl_bbl"]])
+    total_revenue = array('d', [gas + oil + ngl for gas, oil, ngl in zip(gas_revenue, oil_revenue, ngl_revenue)])
+    return {
+        "gas_revenue": gas_revenue,
+        "oil_revenue": oil_revenue,
+        "ngl_revenue": ngl_revenue,
+        "total_revenue": total_revenue,
+    }
+
+
+def working_interest(inputs: DealInputs) -> float:
+    """Share of capex and opex a cost_bearing deal pays (participation_wi, or 1.0 when unset)"""
+    return inputs.participation_wi if inputs.participation_wi > 0 else 1.0
+
+
+def well_schedule(inputs: DealInputs) -> List[Tuple[int, float]]:
+    """
+    (first production month, wells) for every well the costs cover: the spud
+    schedule with unit_development, otherwise the single well whose ramp
+    starts at undeveloped_delay_months.
+    """
+    if inputs.unit_development:
+        return spud_schedule(inputs)
+    return [(inputs.undeveloped_delay_months, 1.0)]
+
+
+def well_cost_profile(inputs: DealInputs) -> Tuple[array, array]:
+    """
+    Gross (8/8) capex per month and wells on production per month.
+    
+    Each well costs drilling_completion_capex × lateral_length_ft / 1000, paid
+    in equal parts over spud_to_sales_months from spud (unit wells spud
+    duct_delay_months before first production; the single well's capex starts
+    with its ramp). A well is on production from its first month until its
+    curve (plus the ramp for the single well) runs out. Production risk
+    scales volumes, not well counts or costs.
+    """
+    horizon = inputs.analysis_years * 12
+    schedule = well_schedule(inputs)
+    gas_curve, oil_curve = production_curves(inputs)
+    life = max(len(gas_curve), len(oil_curve))
+    if inputs.unit_development:
+        spud_offset = inputs.duct_delay_months
+    else:
+        spud_offset = 0
+        life += int(inputs.undeveloped_timing_years * 12) if life else 0
+    
+    installments = max(inputs.spud_to_sales_months, 1)
+    well_capex = inputs.drilling_completion_capex * inputs.lateral_length_ft / 1000
+    capex_schedule = [(max(month - spud_offset, 0), wells) for month, wells in schedule]
+    capex = convolve_schedule([well_capex / installments] * installments, capex_schedule, horizon)
+    producing_wells = convolve_schedule([1.0] * life, schedule, horizon)
+    return capex, producing_wells
+
+
+def costs_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Opex, GP&T and capex borne by the interest"""
+    return cost_columns(inputs, columns, well_cost_profile(inputs) if inputs.cost_bearing else None)
+
+
+def cost_columns(inputs: DealInputs, columns: Dict[str, array],
+                 well_costs: Optional[Tuple[array, array]]) -> Dict[str, array]:
+    """Costs stage over the rows of columns, given (a window of) well_cost_profile for cost_bearing deals"""
+    zeros = _zeros(len(columns["shrunk_gas_mcf"]))
+    
+    # Gas Processing & Transportation
+    # is_cost_bearing_lease=True: we pay our share of GP&T (cost-bearing lease)
+    # is_cost_bearing_lease=False: operator bears GP&T (cost-free lease)
+    if inputs.is_cost_bearing_lease:
+        gpt_rate = inputs.gas_processing_per_mcf
+        gpt_cost = array('d', [gas * gpt_rate for gas in columns["shrunk_gas_mcf"]])
+    else:
+        gpt_cost = zeros
+    
+    if not inputs.cost_bearing:
+        # Lease/royalty basis: operator bears opex and capex
+        return {
+            "fixed_opex": zeros,
+            "variable_opex": zeros,
+            "total_opex": zeros,
+            "gpt_cost": gpt_cost,
+            "capex": zeros,
+        }
+    
+    # Working interest: our WI share of gross capex and opex (revenue stays NRI)
+    wi = working_interest(inputs)
+    gross_capex, producing_wells = well_costs
+    fixed_rate = inputs.fixed_opex_per_month * wi
+    oil_rate = inputs.variable_opex_oil_per_bbl * wi
+    gas_rate = inputs.variable_opex_gas_per_mcf * wi
+    water_rate = inputs.variable_opex_water_per_bblw * wi
+    water_per_oil = inputs.water_yield_bbls_per_bbl_oil
+    water_per_gas = inputs.water_yield_bbls_per_mmcf
+    
+    gross_water = array('d', [
+        oil * water_per_oil + gas * water_per_gas
+        for oil, gas in zip(columns["gross_oil_bbl"], columns["gross_gas_mcf"])
+    ])
+    fixed_opex = array('d', [wells * fixed_rate for wells in producing_wells])
+    variable_opex = array('d', [
+        oil * oil_rate + gas * gas_rate + water * water_rate
+        for oil, gas, water in zip(columns["gross_oil_bbl"], columns["gross_gas_mcf"], gross_water)
+    ])
+    return {
+        "gross_water_bbl": gross_water,
+        "fixed_opex": fixed_opex,
+        "variable_opex": variable_opex,
+        "total_opex": array('d', map(operator.add, fixed_opex, variable_opex)),
+        "gpt_cost": gpt_cost,
+        "capex": array('d', [capex * wi for capex in gross_capex]),
+    }
+
+
+def tax_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Severance and ad valorem taxes on our net revenue share"""
+    gas_price, gas_pct = inputs.gas_price_per_mcf, inputs.severance_tax_gas_pct
+    ngl_price, ngl_pct = inputs.ngl_price, inputs.severance_tax_ngl_pct
+    oil_price, oil_pct = inputs.oil_price_per_bbl, inputs.severance_tax_oil_pct
+    severance_tax = array('d', [
+        oil * oil_price * oil_pct + gas * gas_price * gas_pct + ngl * ngl_price * ngl_pct
+        for oil, gas, ngl in zip(columns["net_oil_bbl"], columns["net_gas_mcf"], columns["net_ngl_bbl"])
+    ])
+    ad_valorem_pct = inputs.ad_valorem_tax_pct
+    ad_valorem_tax = array('d', [revenue * ad_valorem_pct for revenue in columns["total_revenue"]])
+    total_tax = array('d', [sev + adv for sev, adv in zip(severance_tax, ad_valorem_tax)])
+    return {
+        "severance_tax": severance_tax,
+        "ad_valorem_tax": ad_valorem_tax,
+        "total_tax": total_tax,
+    }
+
+
+def fees_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Acquisition cost and G&A fees at month 0, annual G&A amortized monthly"""
+    return fee_columns(inputs, range(inputs.analysis_years * 12))
+
+
+def fee_columns(inputs: DealInputs, months: range) -> Dict[str, array]:
+    """Fees stage for a run of months"""
+    acquisition_cost = _zeros(len(months))
+    ga_fees = _zeros(len(months))
+    if months and months[0] == 0:
+        acquisition_cost[0] = inputs.acquisition_cost
+        ga_fees[0] = inputs.upfront_ga_fees
+    return {
+        "acquisition_cost": acquisition_cost,
+        "ga_fees": ga_fees,
+        "annual_ga": array('d', [inputs.annual_ga / 12.0]) * len(months),
+    }
+
+
+def net_cash_flow_stage(inputs: DealInputs, columns: Dict[str, array]) -> Dict[str, array]:
+    """Net cash flow = revenue - costs - acquisition - GA"""
+    return {
+        "net_cash_flow": array('d', [
+            revenue - opex - gpt - tax - capex - acq - ga - monthly_ga
+            for revenue, opex, gpt, tax, capex, acq, ga, monthly_ga in zip(
+                columns["total_revenue"], columns["total_opex"], columns["gpt_cost"], columns["total_tax"],
+                columns["capex"], columns["acquisition_cost"], columns["ga_fees"], columns["annual_ga"],
+            )
+        ]),
+    }
+
+
+STAGE_FUNCTIONS: Dict[str, Callable[[DealInputs, Dict[str, array]], Dict[str, array]]] = {
+    "timeline": timeline_stage,
+    "volumes": volumes_stage,
+    "net_volumes": net_volumes_stage,
+    "revenue": revenue_stage,
+    "costs": costs_stage,
+    "tax": tax_stage,
+    "fees": fees_stage,
+    "net_cash_flow": net_cash_flow_stage,
+}
 
 
 class MineralEvaluation:
     """Core evaluation engine"""
     
-    def __init__(self, inputs: DealInputs):
+    def __init__(self, inputs: DealInputs, backend: str = "loop"):
+        """
+        Args:
+            inputs: Deal to evaluate
+            backend: "loop" (Python loops over array columns, standard library only)
+                or "numpy" (whole-horizon array operations, see vectorized.py)
+        """
+        if backend not in ("loop", "numpy"):
+            raise ValueError(f"Unknown backend: {backend}")
         self.inputs = inputs
-        self.cash_flows: List[AnnualCashFlow] = []
+        self.backend = backend
+        self.cash_flows: CashFlowLedger = CashFlowLedger()
         self.npv_by_rate: Dict[float, float] = {}
         self.irr: Optional[float] = None
+        self.irr_solution: Optional[IrrSolution] = None
         self.mom: Optional[float] = None
         self.payback_period_months: Optional[float] = None
+        self.metrics: Optional[CashFlowMetrics] = None  # Last scan of the ledger (see calculate_metrics)
+        self.economic_limit_month: Optional[int] = None  # Set when inputs.economic_limit
+        self.truncated_tail: Optional[TruncatedTail] = None  # None when nothing was cut
+        self._columns: Dict[str, Sequence[float]] = {}  # Stage outputs, including intermediates
         
     def evaluate(self):
         """Run full evaluation"""
         self.generate_cash_flows()
-        self.calculate_npv_at_rates()
+        self.calculate_metrics()
         self.calculate_irr()
-        self.calculate_mom()
-        self.calculate_payback()
         
     def generate_cash_flows(self):
-        """Generate monthly/annual cash flows over analysis period"""
-        self.cash_flows = []
+        """Generate monthly cash flows over analysis period (runs every stage)"""
+        self._columns = {}
+        self._run_stages(CASH_FLOW_STAGES)
+    
+    def iter_cash_flows(self, stop: Optional[int] = None, window_months: int = 60) -> Iterator[CashFlowRow]:
+        """
+        Yield monthly rows in order, for consumers that may stop early
+        (payback search, NPV to month X, previews, streaming to CSV).
         
-        # Calculate total capex
-        total_capex = self.inputs.drilling_completion_capex * self.inputs.lateral_length_ft / 1000
-        cumulative_capex = 0.0
+        Once generate_cash_flows()/evaluate() has run, rows are views of the
+        existing ledger. Before that, rows are generated window_months at a
+        time by the loop stages (bit-identical to either backend's ledger) and
+        only the current window is held, plus the gross volume and well-cost
+        profiles, which span the horizon and come from the shared profile
+        cache. With economic_limit, rows at or below the threshold are held
+        back until a later month shows they come before the limit. self is not
+        modified.
         
-        for month in range(self.inputs.analysis_years * 12):
-            current_date = self.inputs.base_date + timedelta(days=month * 30)
-            
-            # Acquisition cost and G&A fees at month 0
-            if month == 0:
-                acq_cost = self.inputs.acquisition_cost
-                ga_fees = self.inputs.upfront_ga_fees
-            else:
-                acq_cost = 0.0
-                ga_fees = 0.0
-            
-            # Annual G&A costs (amortized monthly)
-            monthly_ga = self.inputs.annual_ga / 12.0
-            
-            # Capex period: spread over spud_to_sales_months starting at undeveloped_delay
-            capex_start_month = self.inputs.undeveloped_delay_months
-            capex_end_month = capex_start_month + self.inputs.spud_to_sales_months
-            
-            if total_capex > 0 and capex_start_month <= month < capex_end_month:
-                if cumulative_capex < total_capex:
-                    monthly_capex = min(total_capex / self.inputs.spud_to_sales_months, 
-                                       total_capex - cumulative_capex)
-                    cumulative_capex += monthly_capex
-                else:
-                    monthly_capex = 0.0
-            else:
-                monthly_capex = 0.0
-            
-            # Total upfront costs
-            total_upfront_cost = acq_cost + (monthly_capex if self.inputs.cost_bearing else 0.0)
-            
-            # Calculate months since start of drilling (for ramp calculation)
-            # Ramp starts at undeveloped_delay_months (month when first well spuds)
-            months_since_undeveloped = month - self.inputs.undeveloped_delay_months
-            
-            if months_since_undeveloped < 0:
-                # Before any drilling
-                gross_gas_mcf = 0.0
-                gross_oil_bbl = 0.0
-            elif self.inputs.monthly_gross_gas_volumes:
-                # Use type curve monthly volumes with production ramp
-                ramp_duration_months = int(self.inputs.undeveloped_timing_years * 12)
-                
-                if months_since_undeveloped < ramp_duration_months:
-                    # During ramp (months 0-11 relative to spud)
-                    # Production = (month_index / ramp_duration) × peak_production
-                    ramp_factor = (months_since_undeveloped + 1) / ramp_duration_months
-                    
-                    if len(self.inputs.monthly_gross_gas_volumes) > 0:
-                        peak_gas = self.inputs.monthly_gross_gas_volumes[0]
-                        gross_gas_mcf = peak_gas * ramp_factor
-                    else:
-                        gross_gas_mcf = 0.0
-                    
-                    gross_oil_bbl = 0.0
-                else:
-                    # After ramp: use type curve directly
-                    # tc_month_index: which month of type curve to use
-                    tc_month_index = int(months_since_undeveloped - ramp_duration_months)
-                    
-                    if tc_month_index < len(self.inputs.monthly_gross_gas_volumes):
-                        gross_gas_mcf = self.inputs.monthly_gross_gas_volumes[tc_month_index]
-                    else:
-                        gross_gas_mcf = 0.0
-                    
-                    # Oil volumes
-                    if self.inputs.monthly_gross_oil_volumes and tc_month_index < len(self.inputs.monthly_gross_oil_volumes):
-                        gross_oil_bbl = self.inputs.monthly_gross_oil_volumes[tc_month_index]
-                    else:
-                        gross_oil_bbl = 0.0
-            else:
-                # No type curve provided, use decline curve model (not currently implemented for this case)
-                gross_gas_mcf = 0.0
-                gross_oil_bbl = 0.0
-            
-            # Apply production risk
-            gross_gas_mcf *= self.inputs.production_risk
-            gross_oil_bbl *= self.inputs.production_risk
-            
-            # NGL from shrunk gas
-            shrunk_gas_mcf = gross_gas_mcf * self.inputs.gas_shrink_factor
-            gross_ngl_bbl = shrunk_gas_mcf * self.inputs.ngl_yield_bbls_per_mmcf / 1_000_000
-            
-            # Net to interest (total NRI includes tracts + participation)
-            net_gas_mcf = gross_gas_mcf * self.inputs.total_nri
-            net_oil_bbl = gross_oil_bbl * self.inputs.total_nri
-            net_ngl_bbl = gross_ngl_bbl * self.inputs.total_nri
-            
-            # Revenues
-            gas_revenue = net_gas_mcf * (self.inputs.gas_price_per_mcf + self.inputs.gas_differential_per_mcf) * self.inputs.btu_adjustment
-            oil_revenue = net_oil_bbl * (self.inputs.oil_price_per_bbl + self.inputs.oil_differential_per_bbl)
-            ngl_revenue = net_ngl_bbl * self.inputs.ngl_price_per_bbl
-            total_revenue = gas_revenue + oil_revenue + ngl_revenue
+        Args:
+            stop: Yield months 0..stop-1 (default: the whole horizon)
+            window_months: Rows generated per window
+        
+        e.g. writer.writerows([getattr(row, name) for name in CASH_FLOW_FIELDS]
+                              for row in evaluation.iter_cash_flows())
+        """
+        horizon = self.inputs.analysis_years * 12
+        stop = horizon if stop is None else min(stop, horizon)
+        if len(self.cash_flows):
+            for month in range(min(stop, len(self.cash_flows))):
+                yield self.cash_flows[month]
+            return
+        
+        limited = self.inputs.economic_limit
+        threshold = self.inputs.economic_limit_threshold
+        pending: List[CashFlowRow] = []  # Uneconomic rows, kept only if a later month is above the threshold
+        for ledger in self._iter_ledger_windows(window_months):
+            first = ledger.columns["month"][0]
+            if not limited:
+                for i in range(min(len(ledger), stop - first)):
+                    yield CashFlowRow(ledger, i)
+                if first + len(ledger) >= stop:
+                    return
+                continue
             
-            # Operating Costs (if cost bearing)
-            if self.inputs.cost_bearing:
-                fixed_opex = self.inputs.fixed_opex_per_month if months_on_production > 0 else 0.0
-                variable_opex = (
-                    net_oil_bbl * self.inputs.variable_opex_oil_per_bbl +
-                    net_gas_mcf * self.inputs.variable_opex_gas_per_mcf
+            operating = operating_cash_flow(ledger.columns)
+            for i, row in enumerate(ledger):
+                month = first + i
+                economic = month == 0 or operating[i] > threshold
+                if month >= stop:
+                    if not pending:
+                        return
+                    if economic:
+                        yield from pending
+                        return
+                    continue
+                if not economic:
+                    pending.append(row)
+                    continue
+                yield from pending
+                pending.clear()
+                yield row
+    
+    def _iter_ledger_windows(self, window_months: int) -> Iterator[CashFlowLedger]:
+        """Ledgers of consecutive window_months runs of the horizon, built one at a time"""
+        inputs = self.inputs
+        horizon = inputs.analysis_years * 12
+        gross_gas, gross_oil = volume_profile(inputs)
+        well_costs = well_cost_profile(inputs) if inputs.cost_bearing else None
+        window_months = max(window_months, 1)
+        for start in range(0, horizon, window_months):
+            months = range(start, min(start + window_months, horizon))
+            rows = slice(months.start, months.stop)
+            window_stages = {
+                "timeline": lambda inputs, columns: timeline_columns(months),
+                "volumes": lambda inputs, columns: volume_columns(inputs, gross_gas[rows], gross_oil[rows]),
+                "costs": lambda inputs, columns: cost_columns(
+                    inputs, columns, well_costs and (well_costs[0][rows], well_costs[1][rows])),
+                "fees": lambda inputs, columns: fee_columns(inputs, months),
+            }
+            columns: Dict[str, array] = {}
+            for stage in CASH_FLOW_STAGES:
+                columns.update(window_stages.get(stage, STAGE_FUNCTIONS[stage])(inputs, columns))
+            yield CashFlowLedger.from_columns({name: columns[name] for name in CASH_FLOW_FIELDS})
+    
+    def update(self, **changes) -> List[str]:
+        """
+        Change DealInputs fields and recompute only the stages that depend on them.
+        
+        e.g. update(gas_price_per_mcf=4.0) reruns revenue, tax and net cash flow
+        and the metrics; volumes, costs and fees are reused. Fields that feed no
+        stage (deal_name, base_date, ...) trigger no work; discount_rates only
+        reruns the metric scan; economic-limit fields re-cut the ledger and rerun
+        the metrics. A derived NGL price (ngl_price_per_bbl = 0.0) follows
+        oil_price_per_bbl and ngl_differential_pct_wti.
+        
+        Returns:
+            Cash-flow stages that were rerun
+        """
+        unknown = set(changes) - {f.name for f in fields(DealInputs)}
+        if unknown:
+            raise ValueError(f"Unknown DealInputs fields: {sorted(unknown)}")
+        self.inputs = replace(self.inputs, **changes)
+        
+        if not self._columns:
+            self.evaluate()
+            return list(CASH_FLOW_STAGES)
+        
+        stages = dirty_stages(changes)
+        if stages:
+            self._run_stages(stages)
+            self.calculate_metrics()
+            self.calculate_irr()
+        elif LEDGER_FIELDS & set(changes):
+            self._build_ledger()
+            self.calculate_metrics()
+            self.calculate_irr()
+        elif METRIC_FIELDS & set(changes):
+            self.calculate_metrics()
+        return stages
+    
+    def _run_stages(self, stages: Iterable[str]):
+        """Run cash-flow stages in order and rebuild the ledger from their columns"""
+        if self.backend == "numpy":
+            from vectorized import STAGE_FUNCTIONS as stage_functions
+        else:
+            stage_functions = STAGE_FUNCTIONS
+        
+        for stage in stages:
+            self._columns.update(stage_functions[stage](self.inputs, self._columns))
+        self._build_ledger()
+    
+    def _build_ledger(self):
+        """
+        Ledger from the stage columns, cut at the economic limit when enabled.
+        Metrics then only discount and sum the economic months.
+        """
+        ledger_columns = {name: self._columns[name] for name in CASH_FLOW_FIELDS}
+        if self.backend == "numpy":
+            from vectorized import to_ledger_columns
+            ledger_columns = to_ledger_columns(ledger_columns)
+        
+        self.economic_limit_month = None
+        self.truncated_tail = None
+        if self.inputs.economic_limit:
+            operating = operating_cash_flow(ledger_columns)
+            self.economic_limit_month = economic_limit_month(operating, self.inputs.economic_limit_threshold)
+            keep = max(self.economic_limit_month, 0) + 1  # Month 0 carries the acquisition cost
+            horizon = len(ledger_columns["month"])
+            if keep < horizon:
+                self.truncated_tail = TruncatedTail(
+                    first_month=keep,
+                    months=horizon - keep,
+                    net_cash_flow=sum(ledger_columns["net_cash_flow"][keep:]),
+                    operating_cash_flow=sum(operating[keep:]),
+                    total_revenue=sum(ledger_columns["total_revenue"][keep:]),
+                    gross_gas_mcf=sum(ledger_columns["gross_gas_mcf"][keep:]),
+                    gross_oil_bbl=sum(ledger_columns["gross_oil_bbl"][keep:]),
                 )
-                total_opex = fixed_opex + variable_opex
-            else:
-                # Lease/royalty basis: operator bears costs
-                fixed_opex = 0.0
-                variable_opex = 0.0
-                total_opex = 0.0
-            
-            # Gas Processing & Transportation
-            # On lease basis: we may pay our share of GP&T depending on the lease terms
-            # is_cost_bearing_lease=True: we pay GP&T (cost-bearing lease)
-            # is_cost_bearing_lease=False: operator bears GP&T (cost-free lease)
-            if self.inputs.is_cost_bearing_lease:
-                # Cost-bearing lease: we pay our share of GP&T
-                gpt_cost = shrunk_gas_mcf * self.inputs.gas_processing_per_mcf
-            else:
-                # Cost-free lease or working interest: operator bears/deducts GP&T
-                gpt_cost = 0.0
-            
-            # Taxes (always apply, regardless of cost_bearing status)
-            # Calculated on our net revenue share
-            severance_tax = (
-                net_oil_bbl * self.inputs.oil_price_per_bbl * self.inputs.severance_tax_oil_pct +
-                net_gas_mcf * self.inputs.gas_price_per_mcf * self.inputs.severance_tax_gas_pct +
-                net_ngl_bbl * self.inputs.ngl_price_per_bbl * self.inputs.severance_tax_ngl_pct
-            )
-            ad_valorem_tax = total_revenue * self.inputs.ad_valorem_tax_pct
-            
-            total_tax = severance_tax + ad_valorem_tax
-            
-            # Capex (if cost bearing)
-            cf_capex = monthly_capex if self.inputs.cost_bearing else 0.0
-            
-            # Net cash flow = revenue - costs - acquisition - GA
-            net_cash_flow = total_revenue - total_opex - gpt_cost - total_tax - cf_capex - acq_cost - ga_fees - monthly_ga
-            
-            cf = AnnualCashFlow(
-                year=month // 12,
-                month=month,
-                gross_oil_bbl=gross_oil_bbl,
-                gross_gas_mcf=gross_gas_mcf,
-                gross_ngl_bbl=gross_ngl_bbl,
-                net_oil_bbl=net_oil_bbl,
-                net_gas_mcf=net_gas_mcf,
-                net_ngl_bbl=net_ngl_bbl,
-                oil_revenue=oil_revenue,
-                gas_revenue=gas_revenue,
-                ngl_revenue=ngl_revenue,
-                total_revenue=total_revenue,
-                fixed_opex=fixed_opex,
-                variable_opex=variable_opex,
-                total_opex=total_opex,
-                severance_tax=severance_tax,
-                ad_valorem_tax=ad_valorem_tax,
-                total_tax=total_tax,
-                gpt_cost=gpt_cost,
-                capex=cf_capex,
-                acquisition_cost=acq_cost,
-                ga_fees=ga_fees,
-                annual_ga=monthly_ga,
-                net_cash_flow=net_cash_flow,
-            )
-            self.cash_flows.append(cf)
+                ledger_columns = {name: column[:keep] for name, column in ledger_columns.items()}
+        self.cash_flows = CashFlowLedger.from_columns(ledger_columns)
+        self.metrics = None
+    
+    def calculate_metrics(self):
+        """
+        NPV at each rate, MoM, payback and the summary totals from one scan of
+        the ledger (scan_cash_flows, or the matrix kernel on the numpy backend).
+        """
+        if self.backend == "numpy":
+            from vectorized import scan_cash_flows as scan
+        else:
+            scan = scan_cash_flows
+        self.metrics = scan(self.cash_flows.columns, self.inputs.discount_rates)
+        self.npv_by_rate = self.metrics.npv_by_rate
+        self.mom = self.metrics.mom
+        self.payback_period_months = self.metrics.payback_months
     
     def calculate_npv_at_rates(self):
         """Calculate NPV at each discount rate"""
-        self.npv_by_rate = {}
-        
-        for rate in self.inputs.discount_rates:
-            npv = 0.0
-            for cf in self.cash_flows:
-                months_discounted = cf.month
-                discount_factor = (1 + rate) ** (-months_discounted / 12)
-                npv += cf.net_cash_flow * discount_factor
-            
-            self.npv_by_rate[rate] = npv
+        rates = self.inputs.discount_rates
+        self.npv_by_rate = dict(zip(rates, npv_at_rates(self.cash_flows.net_cash_flow, rates)))
     
     def calculate_irr(self):
-        """Calculate IRR using bisection method"""
-        def npv_func(rate):
-            npv = 0.0
-            for cf in self.cash_flows:
-                months_discounted = cf.month
-                discount_factor = (1 + rate) ** (-months_discounted / 12)
-                npv += cf.net_cash_flow * discount_factor
-            return npv
-        
-        try:
-            # Find NPV at bounds
-            low = 0.0
-            high = 10.0  # Expand search to 1000%
-            
-            npv_low = npv_func(low)
-            npv_high = npv_func(high)
-            
-            # Check if solution exists in range
-            if npv_low * npv_high > 0:
-                # Both same sign - no IRR in this range
-                # Check if both positive (very high returns)
-                if npv_low > 0:
-                    # NPV is always positive, IRR is very high
-                    # Try expanding range
-                    for test_high in [50.0, 100.0, 500.0, 1000.0]:
-                        if npv_func(test_high) < 0:
-                            high = test_high
-                            break
-                    else:
-                        # Still can't find crossing point
-                        self.irr = None
-                        return
-                else:
-                    self.irr = None
-                    return
-            
-            # Bisection method
-            tolerance = 1e-6
-            for iteration in range(200):
-                mid = (low + high) / 2
-                npv_mid = npv_func(mid)
-                
-                if abs(npv_mid) < tolerance:
-                    break
-                
-                if npv_mid < 0:
-                    low = mid
-                else:
-                    high = mid
-            
-            self.irr = (low + high) / 2
-        except:
-            self.irr = None
+        """
+        Calculate IRR with a bracketed Newton solve on the monthly discount
+        factor (see solve_irr). self.irr_solution records convergence.
+        """
+        self.irr_solution = solve_irr(self.cash_flows.net_cash_flow)
+        self.irr = self.irr_solution.rate
+        if not self.irr_solution.converged and self.irr_solution.message != "no sign change":
+            logger.warning(f"IRR for {self.inputs.deal_name} {self.irr_solution.message} "
+                           f"after {self.irr_solution.iterations} iterations")
     
     def calculate_mom(self):
         """Calculate Multiple on Money (MoM)"""
-        total_inflow = sum(cf.net_cash_flow for cf in self.cash_flows if cf.net_cash_flow > 0)
-        total_outflow = abs(sum(cf.net_cash_flow for cf in self.cash_flows if cf.net_cash_flow < 0))
+        net_cash_flows = self.cash_flows.net_cash_flow
+        total_inflow = sum(x for x in net_cash_flows if x > 0)
+        total_outflow = abs(sum(x for x in net_cash_flows if x < 0))
         
         if total_outflow > 0:
             self.mom = total_inflow / total_outflow
@@ -526,26 +1586,69 @@ class MineralEvaluation:
     def calculate_payback(self):
         """Calculate payback period in months"""
         cumulative = 0.0
-        for cf in self.cash_flows:
-            cumulative += cf.net_cash_flow
+        for month, net_cash_flow in zip(self.cash_flows.month, self.cash_flows.net_cash_flow):
+            cumulative += net_cash_flow
             if cumulative >= 0:
-                self.payback_period_months = cf.month
+                self.payback_period_months = month
                 return
         self.payback_period_months = None
     
+    def horizon_metrics(self, irr_cutoff_years: Iterable[int] = (10, 20, 30),
+                        rates: Optional[Sequence[float]] = None) -> HorizonMetrics:
+        """
+        NPV at each rate for every analysis-period cutoff, from one running
+        discounted sum per rate, plus IRR at irr_cutoff_years.
+        
+        Each cutoff equals re-evaluating with analysis_years = cutoff (stages
+        only truncate with the horizon); with economic_limit the cutoffs read
+        the already-cut ledger. Each IRR solve starts from the zero crossing
+        of that cutoff's discounted sums (or the previous cutoff's IRR).
+        
+        Args:
+            irr_cutoff_years: Cutoffs (in years) to solve IRR for
+            rates: NPV rates (default: inputs.discount_rates)
+        """
+        if not self._columns:
+            self.generate_cash_flows()
+        rates = list(self.inputs.discount_rates if rates is None else rates)
+        net_cash_flow = self.cash_flows.net_cash_flow
+        horizon = len(net_cash_flow)
+        cumulative = cumulative_npv(net_cash_flow, rates)
+        
+        irr_by_years: Dict[int, Optional[float]] = {}
+        guess = None
+        for years in sorted(set(irr_cutoff_years)):
+            month = min(12 * years, horizon)
+            crossing = interpolated_irr({rate: cumulative[rate][month] for rate in rates})
+            solution = solve_irr(net_cash_flow[:month], guess=crossing if crossing is not None else guess)
+            irr_by_years[years] = solution.rate
+            if solution.rate is not None:
+                guess = solution.rate
+        return HorizonMetrics(discount_rates=rates, cumulative_npv=cumulative, irr_by_years=irr_by_years)
+    
     def summary(self) -> Dict:
         """Return summary results"""
-        return {
+        if self.metrics is not None:
+            totals = self.metrics.totals
+        else:
+            # Ledger built without calculate_metrics (e.g. generate_cash_flows only)
+            totals = {key: sum(self.cash_flows.column(name)) for key, name in SUMMARY_TOTAL_COLUMNS.items()}
+            totals["cumulative_cash_flow"] = sum(self.cash_flows.net_cash_flow)
+        summary = {
             "deal_name": self.inputs.deal_name,
             "irr": self.irr,
             "mom": self.mom,
             "payback_months": self.payback_period_months,
             "npv_by_rate": self.npv_by_rate,
             "acquisition_cost": self.inputs.acquisition_cost,
-            "total_capex": sum(cf.capex for cf in self.cash_flows),
-            "total_revenue": sum(cf.total_revenue for cf in self.cash_flows),
-            "total_opex": sum(cf.total_opex for cf in self.cash_flows),
-            "total_tax": sum(cf.total_tax for cf in self.cash_flows),
-            "cumulative_cash_flow": sum(cf.net_cash_flow for cf in self.cash_flows),
-            "total_investment": self.inputs.acquisition_cost + sum(cf.capex for cf in self.cash_flows),
+            "total_capex": totals["total_capex"],
+            "total_revenue": totals["total_revenue"],
+            "total_opex": totals["total_opex"],
+            "total_tax": totals["total_tax"],
+            "cumulative_cash_flow": totals["cumulative_cash_flow"],
+            "total_investment": self.inputs.acquisition_cost + totals["total_capex"],
         }
+        if self.inputs.economic_limit:
+            summary["economic_limit_month"] = self.economic_limit_month
+            summary["truncated_tail"] = asdict(self.truncated_tail) if self.truncated_tail else None
+        return summary
@@ -6,6 +6,7 @@ Interactive scenario analysis and sensitivity testing
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from dataclasses import fields
 from datetime import datetime
 from core import DealInputs, Tract, MineralEvaluation
 from appa113_volumes import APPA113_VOLUMES
@@ -526,9 +527,17 @@ with tab5:
             base_date=datetime(2026, 2, 28),
         )
         
-        # Run evaluation
-        eval = MineralEvaluation(deal)
-        eval.evaluate()
+        # Run evaluation (incrementally when only some inputs moved since last run)
+        if st.session_state.results:
+            eval = st.session_state.results[0]
+            changes = {
+                f.name: getattr(deal, f.name) for f in fields(DealInputs)
+                if getattr(deal, f.name) != getattr(eval.inputs, f.name)
+            }
+            eval.update(**changes)
+        else:
+            eval = MineralEvaluation(deal)
+            eval.evaluate()
         st.session_state.results = (eval, deal)
         
         # Show warning if year4_flat is enabled
@@ -582,12 +591,13 @@ with tab5:
         
         # Cash flow detail
         st.subheader("Monthly Cash Flow (First 60 Months)")
+        ledger = eval.cash_flows
         cf_df = pd.DataFrame({
-            'Month': [cf.month for cf in eval.cash_flows[:60]],
-            'Gas (MMcf)': [cf.net_gas_mcf for cf in eval.cash_flows[:60]],
-            'Revenue ($k)': [cf.total_revenue * 1000 for cf in eval.cash_flows[:60]],
-            'Taxes ($k)': [cf.total_tax * 1000 for cf in eval.cash_flows[:60]],
-            'Net CF ($k)': [cf.net_cash_flow * 1000 for cf in eval.cash_flows[:60]],
+            'Month': ledger.month[:60].tolist(),
+            'Gas (MMcf)': ledger.net_gas_mcf[:60].tolist(),
+            'Revenue ($k)': [x * 1000 for x in ledger.total_revenue[:60]],
+            'Taxes ($k)': [x * 1000 for x in ledger.total_tax[:60]],
+            'Net CF ($k)': [x * 1000 for x in ledger.net_cash_flow[:60]],
         })
         st.dataframe(cf_df, use_container_width=True)
         
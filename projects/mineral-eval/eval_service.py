@@ -0,0 +1,279 @@
+"""
+Evaluation Service
+Local HTTP/JSON front end to a pool of warm evaluation workers, so the
+dashboard, batch scripts and other desks share one engine instead of each
+process cold-loading the libraries.
+
+Workers are started once with the type-curve library and price deck parsed
+and the engine warmed up (imports, decline and discount-factor caches).
+Identical requests that arrive while one is still being evaluated are
+coalesced: they are keyed by deal_hash (plus library references and the
+requested columns) and all wait on the same worker result.
+
+Endpoints:
+    POST /evaluate   {"deal": {DealInputs fields},
+                      "type_curve": "APPA_113.1",        (optional)
+                      "price_scenario": "Gas_3.0_Oil_60", (optional)
+                      "columns": ["month", "net_cash_flow"]} (optional; true for all)
+                     -> {"summary": {...}, "columns": {name: [...]}}
+    GET  /health     -> worker count and request counters
+
+Usage:
+    python eval_service.py --type-curves TC.csv --price-deck prices.csv --port 8765
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import fields
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from core import CASH_FLOW_FIELDS, DealInputs, MineralEvaluation, Tract
+from evaluation_cache import deal_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+DEAL_FIELDS = frozenset(field.name for field in fields(DealInputs))
+REQUEST_KEYS = frozenset({"deal", "type_curve", "price_scenario", "columns"})
+
+# Worker-process state, set by _init_worker
+_TYPE_CURVES: Dict = {}
+_PRICE_SCENARIOS: Dict = {}
+_BACKEND = "loop"
+
+
+def deal_from_payload(deal: Dict) -> DealInputs:
+    """DealInputs from a JSON object (tracts as objects, base_date as ISO text)"""
+    unknown = set(deal) - DEAL_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown DealInputs fields: {', '.join(sorted(unknown))}")
+    values = dict(deal)
+    if "tracts" in values:
+        values["tracts"] = [Tract(**tract) for tract in values["tracts"]]
+    if isinstance(values.get("base_date"), str):
+        values["base_date"] = datetime.fromisoformat(values["base_date"])
+    return DealInputs(**values)
+
+
+def parse_request(payload: Dict) -> Tuple[DealInputs, Optional[str], Optional[str], Tuple[str, ...]]:
+    """Validate a request body: (deal, type_curve, price_scenario, columns)"""
+    if not isinstance(payload, dict) or not isinstance(payload.get("deal"), dict):
+        raise ValueError('Request body must be an object with a "deal" object')
+    unknown = set(payload) - REQUEST_KEYS
+    if unknown:
+        raise ValueError(f"Unknown request keys: {', '.join(sorted(unknown))}")
+    columns = payload.get("columns")
+    if columns is None:
+        columns = ()
+    elif columns is True:
+        columns = CASH_FLOW_FIELDS
+    elif not isinstance(columns, list):
+        raise ValueError('"columns" must be a list of cash-flow column names or true')
+    missing = [str(name) for name in columns if name not in CASH_FLOW_FIELDS]
+    if missing:
+        raise ValueError(f"Unknown cash-flow columns: {', '.join(missing)}")
+    return deal_from_payload(payload["deal"]), payload.get("type_curve"), payload.get("price_scenario"), tuple(columns)
+
+
+def _init_worker(type_curve_path: Optional[str], price_deck_path: Optional[str], backend: str):
+    """Pool initializer: load the libraries and warm the engine once per worker"""
+    global _TYPE_CURVES, _PRICE_SCENARIOS, _BACKEND
+    if type_curve_path:
+        from tc_library_parser import parse_tc_library
+        _TYPE_CURVES = parse_tc_library(type_curve_path)
+    if price_deck_path:
+        from price_deck_parser import parse_price_deck
+        _PRICE_SCENARIOS = parse_price_deck(price_deck_path)
+    _BACKEND = backend
+    warmup = MineralEvaluation(DealInputs(deal_name="warmup", basin="Appalachia", type_curve_id="warmup",
+                                          initial_gas_rate_mcf_per_day=5000.0), backend=backend)
+    warmup.evaluate()
+
+
+def _json_summary(summary: Dict) -> Dict:
+    encoded = dict(summary)
+    encoded["npv_by_rate"] = {f"{rate:g}": npv for rate, npv in summary["npv_by_rate"].items()}
+    return encoded
+
+
+def evaluate_request(deal: Dict, type_curve: Optional[str], price_scenario: Optional[str],
+                     columns: Tuple[str, ...]) -> Dict:
+    """Resolve library references, evaluate and encode the response (worker entry point)"""
+    changes = {}
+    if type_curve is not None:
+        curve = _TYPE_CURVES.get(type_curve)
+        if curve is None:
+            raise ValueError(f"Type curve not in the library: {type_curve}")
+        changes["monthly_gross_gas_volumes"] = list(curve.monthly_volumes)
+        changes["gas_eur_mmcf"] = curve.eur_mmcf
+    if price_scenario is not None:
+        scenario = _PRICE_SCENARIOS.get(price_scenario)
+        if scenario is None:
+            raise ValueError(f"Price scenario not in the deck: {price_scenario}")
+        changes["gas_price_per_mcf"] = scenario.gas_price_base
+        changes["oil_price_per_bbl"] = scenario.oil_price_base
+    # Applied before DealInputs is built, so a scenario's oil price also sets the derived NGL price
+    inputs = deal_from_payload({**deal, **changes})
+    evaluation = MineralEvaluation(inputs, backend=_BACKEND)
+    evaluation.evaluate()
+    ledger = evaluation.cash_flows
+    return {
+        "summary": _json_summary(evaluation.summary()),
+        "columns": {name: ledger.column(name).tolist() for name in columns},
+    }
+
+
+class EvaluationService:
+    """
+    Worker pool plus in-flight request coalescing.
+    
+    Usage:
+        service = EvaluationService(type_curve_path="TC.csv", max_workers=4)
+        response = service.evaluate({"deal": {...}, "columns": ["net_cash_flow"]})
+        service.close()
+    """
+    
+    def __init__(self, type_curve_path: Optional[str] = None, price_deck_path: Optional[str] = None,
+                 max_workers: Optional[int] = None, backend: str = "loop"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.requests = 0
+        self.coalesced = 0
+        self.evaluations = 0
+        self.errors = 0
+        self._in_flight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                             initargs=(type_curve_path, price_deck_path, backend))
+        # Start every worker now so the first requests do not pay for loading
+        for future in [self._executor.submit(os.getpid) for _ in range(self.max_workers)]:
+            future.result()
+    
+    def submit(self, payload: Dict) -> Tuple[str, Future]:
+        """(deal_name, future of the response) for a request body; raises ValueError if invalid"""
+        inputs, type_curve, price_scenario, columns = parse_request(payload)
+        key = (deal_hash(inputs), type_curve, price_scenario, columns)
+        with self._lock:
+            self.requests += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return inputs.deal_name, future
+            future = self._executor.submit(evaluate_request, payload["deal"], type_curve, price_scenario, columns)
+            self._in_flight[key] = future
+            self.evaluations += 1
+        future.add_done_callback(lambda _: self._finish(key))
+        return inputs.deal_name, future
+    
+    def evaluate(self, payload: Dict) -> Dict:
+        """Response body for a request body (blocks until evaluated)"""
+        deal_name, future = self.submit(payload)
+        response = future.result()
+        # Coalesced requests may differ in name only (deal_hash ignores it)
+        if response["summary"]["deal_name"] != deal_name:
+            response = {**response, "summary": {**response["summary"], "deal_name": deal_name}}
+        return response
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "evaluations": self.evaluations,
+                "errors": self.errors,
+                "in_flight": len(self._in_flight),
+            }
+    
+    def close(self):
+        self._executor.shutdown()
+    
+    def _finish(self, key: Tuple):
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: '_ServiceServer'
+    
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self._reply(200, {"status": "ok", **self.server.service.stats()})
+        else:
+            self._reply(404, {"error": f"Not found: {self.path}"})
+    
+    def do_POST(self):
+        if self.path.rstrip("/") != "/evaluate":
+            self._reply(404, {"error": f"Not found: {self.path}"})
+            return
+        service = self.server.service
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            self._reply(200, service.evaluate(payload))
+        except (ValueError, TypeError) as e:
+            with service._lock:
+                service.errors += 1
+            self._reply(400, {"error": str(e)})
+        except Exception as e:
+            logger.exception("Evaluation failed")
+            with service._lock:
+                service.errors += 1
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+    
+    def _reply(self, status: int, body: Dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class _ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], service: EvaluationService):
+        super().__init__(address, _RequestHandler)
+        self.service = service
+
+
+def make_server(service: EvaluationService, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """HTTP server bound to a service (call serve_forever, then shutdown)"""
+    return _ServiceServer((host, port), service)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Local mineral evaluation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--backend", default="loop", choices=["loop", "numpy"])
+    parser.add_argument("--type-curves", default=None, help="Type-curve library CSV")
+    parser.add_argument("--price-deck", default=None, help="Price deck CSV")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO)
+    service = EvaluationService(args.type_curves, args.price_deck, args.workers, args.backend)
+    server = make_server(service, args.host, args.port)
+    logger.info(f"Evaluation service on http://{args.host}:{args.port} with {service.max_workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Evaluation Cache
+Content-addressed memoization of MineralEvaluation results. A deal is keyed by
+a canonical hash of its DealInputs, so identical deals hit the cache across
+dashboard reruns, batch jobs and users sharing an on-disk cache file.
+
+Two tiers:
+- In-memory LRU (bounded by entry count and column bytes)
+- Optional SQLite file (bounded by stored bytes, least recently used evicted)
+
+Each entry holds summary() and the cash-flow columns. Columns that are all
+zero are not stored, and the rest are zlib-compressed on disk. Callers get
+copies, so modifying a result never alters the cached entry.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import math
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from core import CASH_FLOW_FIELDS, CashFlowLedger, DealInputs, MineralEvaluation, TractLedger
+
+logger = logging.getLogger(__name__)
+
+# Bump when engine changes alter results, so stale on-disk entries stop matching
+#   2: deals without type-curve volumes produce decline-curve volumes
+#   3: cost-bearing (working-interest) evaluation
+CACHE_VERSION = 3
+
+# Fields that label a deal but never enter its cash flows. base_date defaults to
+# datetime.now and would otherwise make every DealInputs unique.
+NON_ECONOMIC_FIELDS = frozenset({"deal_name", "base_date"})
+
+
+def _canonical(value, hasher):
+    """Feed a value into the hash with an unambiguous type-tagged encoding"""
+    if isinstance(value, bool):
+        hasher.update(b"b1" if value else b"b0")
+    elif isinstance(value, (int, float)):
+        # Ints and floats that compare equal hash equal (1 == 1.0); -0.0 as 0.0
+        number = float(value) + 0.0
+        if math.isnan(number):
+            hasher.update(b"fnan")
+        else:
+            hasher.update(b"f" + struct.pack("<d", number))
+    elif isinstance(value, str):
+        encoded = value.encode()
+        hasher.update(b"s" + struct.pack("<q", len(encoded)) + encoded)
+    elif value is None:
+        hasher.update(b"n")
+    elif isinstance(value, (list, tuple, array)):
+        if all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+            # Volume and rate lists: one packed buffer instead of per-item tags
+            packed = array('d', (float(item) + 0.0 for item in value)).tobytes()
+            hasher.update(b"F" + struct.pack("<q", len(value)) + packed)
+        else:
+            hasher.update(b"L" + struct.pack("<q", len(value)))
+            for item in value:
+                _canonical(item, hasher)
+    elif isinstance(value, TractLedger):
+        # Packed columns plus each tract's unit_name, not one Tract at a time
+        hasher.update(b"T")
+        for column in (value.mineral_acres, value.royalty_rate, value.drilling_unit_gross_acres):
+            _canonical(column, hasher)
+        _canonical([value.units[position] for position in value.unit_index], hasher)
+    elif is_dataclass(value):
+        hasher.update(b"D" + type(value).__name__.encode())
+        for f in fields(value):
+            _canonical(f.name, hasher)
+            _canonical(getattr(value, f.name), hasher)
+    elif isinstance(value, (datetime, date)):
+        _canonical(value.isoformat(), hasher)
+    else:
+        raise TypeError(f"Cannot hash {type(value).__name__} value {value!r}")
+
+
+def deal_hash(inputs: DealInputs) -> str:
+    """
+    Canonical SHA-256 of the economic content of a DealInputs.
+    
+    Field order, int/float spelling and NON_ECONOMIC_FIELDS do not affect the
+    hash; any change to a value that feeds the cash flows does.
+    """
+    hasher = hashlib.sha256(b"mineral-eval:%d" % CACHE_VERSION)
+    for f in fields(inputs):
+        if f.name in NON_ECONOMIC_FIELDS:
+            continue
+        _canonical(f.name, hasher)
+        _canonical(getattr(inputs, f.name), hasher)
+    return hasher.hexdigest()
+
+
+@dataclass
+class CachedEvaluation:
+    """Summary and cash-flow columns of one evaluated deal"""
+    key: str
+    summary: Dict
+    columns: Dict[str, array]  # all-zero columns omitted
+    
+    @property
+    def ledger(self) -> CashFlowLedger:
+        return CashFlowLedger.from_columns(self.columns)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+    
+    @classmethod
+    def from_evaluation(cls, key: str, evaluation: MineralEvaluation) -> 'CachedEvaluation':
+        ledger = evaluation.cash_flows
+        columns = {
+            name: array(ledger.column(name).typecode, ledger.column(name))
+            for name in CASH_FLOW_FIELDS
+            if name == "month" or any(ledger.column(name))
+        }
+        # The summary shares npv_by_rate etc. with the live evaluation
+        return cls(key=key, summary=copy.deepcopy(evaluation.summary()), columns=columns)
+    
+    def copy(self, deal_name: Optional[str] = None) -> 'CachedEvaluation':
+        """Independent copy of summary and columns, optionally under another deal name"""
+        summary = copy.deepcopy(self.summary)
+        if deal_name is not None:
+            summary["deal_name"] = deal_name
+        return CachedEvaluation(key=self.key, summary=summary,
+                                columns={name: column[:] for name, column in self.columns.items()})
+    
+    def encode(self) -> bytes:
+        """Compressed column blob: JSON header (name, typecode, length) + raw buffers"""
+        header = [(name, column.typecode, len(column)) for name, column in self.columns.items()]
+        header_bytes = json.dumps(header).encode()
+        body = b"".join(column.tobytes() for column in self.columns.values())
+        return zlib.compress(struct.pack("<q", len(header_bytes)) + header_bytes + body)
+    
+    @staticmethod
+    def decode_columns(blob: bytes) -> Dict[str, array]:
+        raw = zlib.decompress(blob)
+        (header_length,) = struct.unpack_from("<q", raw)
+        offset = 8 + header_length
+        columns = {}
+        for name, typecode, length in json.loads(raw[8:offset]):
+            column = array(typecode)
+            end = offset + column.itemsize * length
+            column.frombytes(raw[offset:end])
+            columns[name] = column
+            offset = end
+        return columns
+
+
+def _summary_to_json(summary: Dict) -> str:
+    encoded = dict(summary)
+    encoded["npv_by_rate"] = [[rate, npv] for rate, npv in summary["npv_by_rate"].items()]
+    return json.dumps(encoded)
+
+
+def _summary_from_json(text: str) -> Dict:
+    summary = json.loads(text)
+    summary["npv_by_rate"] = {rate: npv for rate, npv in summary["npv_by_rate"]}
+    return summary
+
+
+class EvaluationCache:
+    """
+    Two-tier evaluation cache keyed by deal_hash.
+    
+    Usage:
+        cache = EvaluationCache(path="evaluations.sqlite")
+        result = cache.evaluate(deal)      # computes on first call
+        result = cache.evaluate(deal)      # memory hit
+        result.summary["npv_by_rate"][0.10], result.ledger.net_cash_flow
+    """
+    
+    def __init__(self, max_entries: int = 256, max_memory_bytes: int = 64 * 1024 * 1024,
+                 path: Optional[str] = None, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: 'OrderedDict[str, CachedEvaluation]' = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                "key TEXT PRIMARY KEY, summary TEXT NOT NULL, columns BLOB NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS evaluations_lru ON evaluations (last_access)")
+            self._db.commit()
+    
+    def get(self, inputs: DealInputs) -> Optional[CachedEvaluation]:
+        """Cached result for a deal, or None (counts a hit or a miss)"""
+        return self._get(deal_hash(inputs), inputs.deal_name)
+    
+    def put(self, inputs: DealInputs, evaluation: MineralEvaluation) -> CachedEvaluation:
+        """Store an evaluated deal in both tiers"""
+        entry = CachedEvaluation.from_evaluation(deal_hash(inputs), evaluation)
+        with self._lock:
+            self._remember(entry)
+            self._write_disk(entry)
+        return entry.copy()
+    
+    def evaluate(self, inputs: DealInputs, backend: str = "loop") -> CachedEvaluation:
+        """Cached result for a deal, evaluating and storing it on a miss"""
+        key = deal_hash(inputs)
+        entry = self._get(key, inputs.deal_name)
+        if entry is None:
+            evaluation = MineralEvaluation(inputs, backend=backend)
+            evaluation.evaluate()
+            entry = CachedEvaluation.from_evaluation(key, evaluation)
+            with self._lock:
+                self._remember(entry)
+                self._write_disk(entry)
+            entry = entry.copy()
+        return entry
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+    
+    def clear(self, disk: bool = False):
+        """Drop the in-memory tier (and the on-disk tier with disk=True)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if disk and self._db is not None:
+                self._db.execute("DELETE FROM evaluations")
+                self._db.commit()
+    
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def _get(self, key: str, deal_name: str) -> Optional[CachedEvaluation]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+            else:
+                entry = self._read_disk(key)
+                if entry is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                self.disk_hits += 1
+                self._remember(entry)
+        # Same economics under another name: relabel the copy handed out
+        return entry.copy(deal_name)
+    
+    def _remember(self, entry: CachedEvaluation):
+        previous = self._memory.pop(entry.key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[entry.key] = entry
+        self._memory_bytes += entry.nbytes
+        while len(self._memory) > 1 and (len(self._memory) > self.max_entries
+                                         or self._memory_bytes > self.max_memory_bytes):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self.evictions += 1
+    
+    def _read_disk(self, key: str) -> Optional[CachedEvaluation]:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT summary, columns FROM evaluations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE evaluations SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return CachedEvaluation(key=key, summary=_summary_from_json(row[0]),
+                                columns=CachedEvaluation.decode_columns(row[1]))
+    
+    def _write_disk(self, entry: CachedEvaluation):
+        if self._db is None:
+            return
+        summary = _summary_to_json(entry.summary)
+        blob = entry.encode()
+        size = len(summary) + len(blob)
+        self._db.execute(
+            "INSERT OR REPLACE INTO evaluations (key, summary, columns, size, last_access) VALUES (?, ?, ?, ?, ?)",
+            (entry.key, summary, blob, size, time.time()),
+        )
+        # Evict least recently used rows until the file's payload fits
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM evaluations").fetchone()[0]
+        if total > self.max_disk_bytes:
+            for key, row_size in self._db.execute(
+                    "SELECT key, size FROM evaluations WHERE key != ? ORDER BY last_access", (entry.key,)).fetchall():
+                self._db.execute("DELETE FROM evaluations WHERE key = ?", (key,))
+                self.evictions += 1
+                total -= row_size
+                if total <= self.max_disk_bytes:
+                    break
+            logger.debug(f"Evaluation cache evicted rows down to {total} bytes")
+        self._db.commit()
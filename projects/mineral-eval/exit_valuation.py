@@ -0,0 +1,144 @@
+"""
+Exit-Year Valuation
+IRR, MoM and NPV of selling the interest at the end of each candidate year,
+next to the blowdown case (holding to the end of the analysis period).
+
+Selling at the end of year k means keeping months 0..12k-1 and receiving the
+exit value in month 12k, valued either as
+- a PDP multiple: multiple × net cash flow of the 12 months after the sale
+- PV-x: the remaining cash flows discounted at x to the sale month
+
+One evaluation supplies the cash flows; every exit year then reads prefix
+sums (held cash flow, inflows, outflows, discounted cash flow per rate) and
+suffix sums (remaining PV) in O(1). IRRs are solved per exit year on the
+truncated cash flows, each starting from the previous year's IRR.
+"""
+
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Union
+
+from core import DealInputs, MineralEvaluation, discount_factors, monthly_discount_factor, solve_irr
+
+
+@dataclass
+class ExitCase:
+    """Metrics of selling at the end of one year"""
+    exit_year: int
+    exit_month: int  # Month the exit value is received (12 × exit_year)
+    exit_value: float
+    npv_by_rate: Dict[float, float]  # Held cash flows plus the exit value
+    irr: Optional[float]
+    mom: Optional[float]
+
+
+@dataclass
+class ExitSweep:
+    """Exit cases for every candidate year, plus the blowdown case"""
+    deal_name: str
+    method: str  # "pdp_multiple" or "pv"
+    parameter: float  # The multiple, or the PV discount rate
+    blowdown_irr: Optional[float]
+    blowdown_mom: Optional[float]
+    blowdown_npv_by_rate: Dict[float, float]
+    cases: List[ExitCase]
+    
+    def best(self, metric: Union[str, float] = "irr") -> Optional[ExitCase]:
+        """Exit year with the highest irr, mom or npv at a rate (e.g. best(0.10))"""
+        if isinstance(metric, (int, float)) and not isinstance(metric, bool):
+            key = lambda case: case.npv_by_rate[metric]
+        else:
+            key = lambda case: getattr(case, metric)
+        candidates = [case for case in self.cases if key(case) is not None]
+        return max(candidates, key=key) if candidates else None
+    
+    def to_records(self) -> List[Dict]:
+        """One row per exit year (e.g. pandas.DataFrame(sweep.to_records()))"""
+        return [
+            {
+                "exit_year": case.exit_year,
+                "exit_value": case.exit_value,
+                "irr": case.irr,
+                "mom": case.mom,
+                **{f"npv_{rate:g}": npv for rate, npv in case.npv_by_rate.items()},
+            }
+            for case in self.cases
+        ]
+
+
+def exit_values(net_cash_flow: Sequence[float], exit_months: Sequence[int],
+                pdp_multiple: Optional[float] = None, pv_rate: Optional[float] = None) -> List[float]:
+    """Exit value at each sale month (exactly one of pdp_multiple or pv_rate)"""
+    if (pdp_multiple is None) == (pv_rate is None):
+        raise ValueError("Give exactly one of pdp_multiple or pv_rate")
+    horizon = len(net_cash_flow)
+    if pdp_multiple is not None:
+        prefix = list(accumulate(net_cash_flow, initial=0.0))
+        return [pdp_multiple * (prefix[min(month + 12, horizon)] - prefix[month]) for month in exit_months]
+    
+    # remaining[m] = PV at month m of months m..horizon-1 (suffix Horner pass)
+    v = monthly_discount_factor(pv_rate)
+    remaining = [0.0] * (horizon + 1)
+    for month in range(horizon - 1, -1, -1):
+        remaining[month] = net_cash_flow[month] + v * remaining[month + 1]
+    return [remaining[month] for month in exit_months]
+
+
+def exit_sweep(deal: DealInputs, pdp_multiple: Optional[float] = None, pv_rate: Optional[float] = None,
+               exit_years: Optional[Sequence[int]] = None, backend: str = "loop") -> ExitSweep:
+    """
+    Value a sale at the end of every candidate year.
+    
+    Args:
+        deal: Deal to evaluate
+        pdp_multiple: Exit at this multiple of next-twelve-month net cash flow
+        pv_rate: Exit at the PV of the remaining cash flows at this rate
+        exit_years: Candidate years (default: every year before the cash flows end)
+        backend: MineralEvaluation backend
+    
+    Returns:
+        ExitSweep with one ExitCase per exit year inside the cash-flow horizon
+    """
+    evaluation = MineralEvaluation(deal, backend=backend)
+    evaluation.evaluate()
+    net_cash_flow = list(evaluation.cash_flows.net_cash_flow)
+    horizon = len(net_cash_flow)
+    if exit_years is None:
+        exit_years = range(1, (horizon - 1) // 12 + 1)
+    exit_years = sorted(year for year in exit_years if 0 < 12 * year < horizon)
+    exit_months = [12 * year for year in exit_years]
+    values = exit_values(net_cash_flow, exit_months, pdp_multiple, pv_rate)
+    
+    # Prefix sums over months 0..m-1
+    inflow = list(accumulate((value if value > 0 else 0.0 for value in net_cash_flow), initial=0.0))
+    outflow = list(accumulate((-value if value < 0 else 0.0 for value in net_cash_flow), initial=0.0))
+    rates = list(deal.discount_rates)
+    factors = {rate: discount_factors(rate, horizon) for rate in rates}
+    discounted = {rate: list(accumulate(map(float.__mul__, net_cash_flow, factors[rate]), initial=0.0))
+                  for rate in rates}
+    
+    cases = []
+    guess = evaluation.irr
+    for year, month, value in zip(exit_years, exit_months, values):
+        total_inflow = inflow[month] + max(value, 0.0)
+        total_outflow = outflow[month] + max(-value, 0.0)
+        solution = solve_irr(net_cash_flow[:month] + [value], guess=guess)
+        guess = solution.rate if solution.rate is not None else guess
+        cases.append(ExitCase(
+            exit_year=year,
+            exit_month=month,
+            exit_value=value,
+            npv_by_rate={rate: discounted[rate][month] + value * factors[rate][month] for rate in rates},
+            irr=solution.rate,
+            mom=total_inflow / total_outflow if total_outflow > 0 else None,
+        ))
+    
+    return ExitSweep(
+        deal_name=deal.deal_name,
+        method="pdp_multiple" if pdp_multiple is not None else "pv",
+        parameter=pdp_multiple if pdp_multiple is not None else pv_rate,
+        blowdown_irr=evaluation.irr,
+        blowdown_mom=evaluation.mom,
+        blowdown_npv_by_rate=evaluation.npv_by_rate,
+        cases=cases,
+    )
@@ -0,0 +1,295 @@
+"""
+Monte Carlo Valuation
+Samples EUR, price levels, development delay and production risk from
+user distributions around a base DealInputs and returns NPV and IRR
+distributions (P90/P50/P10).
+
+Trials run in fixed-size chunks across a process pool. Each chunk has its own
+random stream derived from (seed, chunk index), and convergence is checked on
+chunks in index order, so a given seed reproduces the same results regardless
+of the number of workers or which chunk finishes first.
+
+Percentile convention (industry): P90 is the low case (90% chance of
+exceeding it), P10 the high case.
+"""
+
+import logging
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from core import DealInputs, MineralEvaluation
+
+logger = logging.getLogger(__name__)
+
+PERCENTILE_LEVELS = ("P90", "P50", "P10")
+
+
+class Distribution(Protocol):
+    def sample(self, rng: random.Random) -> float:
+        ...
+
+
+@dataclass
+class Fixed:
+    value: float
+    
+    def sample(self, rng: random.Random) -> float:
+        return self.value
+
+
+@dataclass
+class Uniform:
+    low: float
+    high: float
+    
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+@dataclass
+class Triangular:
+    low: float
+    mode: float
+    high: float
+    
+    def sample(self, rng: random.Random) -> float:
+        return rng.triangular(self.low, self.high, self.mode)
+
+
+@dataclass
+class Normal:
+    mean: float
+    std_dev: float
+    minimum: Optional[float] = None  # Optional truncation (clamped)
+    
+    def sample(self, rng: random.Random) -> float:
+        value = rng.gauss(self.mean, self.std_dev)
+        return value if self.minimum is None else max(self.minimum, value)
+
+
+@dataclass
+class LogNormal:
+    """Log-normal given its P50 (median) and the P10/P50 ratio, as EUR and price ranges usually are quoted"""
+    p50: float
+    p10_over_p50: float = 2.0
+    
+    def sample(self, rng: random.Random) -> float:
+        sigma = math.log(self.p10_over_p50) / 1.2815515655446004  # z at 90th percentile
+        return rng.lognormvariate(math.log(self.p50), sigma)
+
+
+@dataclass
+class Discrete:
+    values: List[float]
+    weights: Optional[List[float]] = None
+    
+    def sample(self, rng: random.Random) -> float:
+        return rng.choices(self.values, weights=self.weights)[0]
+
+
+@dataclass
+class MonteCarloSpec:
+    """
+    Distributions to sample per trial (None = keep the base deal's value).
+    
+    eur_multiplier scales monthly_gross_gas/oil volumes (1.0 = type curve EUR).
+    undeveloped_delay_months samples are rounded to whole months.
+    """
+    eur_multiplier: Optional[Distribution] = None
+    gas_price_per_mcf: Optional[Distribution] = None
+    oil_price_per_bbl: Optional[Distribution] = None
+    undeveloped_delay_months: Optional[Distribution] = None
+    production_risk: Optional[Distribution] = None
+
+
+@dataclass
+class MonteCarloResults:
+    """Per-trial samples and their percentiles"""
+    seed: int
+    trials: int
+    converged: bool  # True if stopped early on percentile convergence
+    npv_by_rate: Dict[float, List[float]]
+    irr: List[Optional[float]]
+    
+    def npv_percentiles(self, rate: float) -> Dict[str, float]:
+        return _p_values(sorted(self.npv_by_rate[rate]))
+    
+    def irr_percentiles(self) -> Dict[str, Optional[float]]:
+        """IRR percentiles over trials that have an IRR (see irr_missing)"""
+        values = sorted(irr for irr in self.irr if irr is not None)
+        if not values:
+            return {level: None for level in PERCENTILE_LEVELS}
+        return _p_values(values)
+    
+    @property
+    def irr_missing(self) -> int:
+        """Trials where NPV never changed sign (no IRR)"""
+        return sum(1 for irr in self.irr if irr is None)
+    
+    def summary(self) -> Dict:
+        return {
+            "seed": self.seed,
+            "trials": self.trials,
+            "converged": self.converged,
+            "npv": {rate: self.npv_percentiles(rate) for rate in self.npv_by_rate},
+            "irr": self.irr_percentiles(),
+            "irr_missing": self.irr_missing,
+        }
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..1) of already-sorted values"""
+    position = q * (len(sorted_values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def _p_values(sorted_values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "P90": percentile(sorted_values, 0.10),
+        "P50": percentile(sorted_values, 0.50),
+        "P10": percentile(sorted_values, 0.90),
+    }
+
+
+def run_chunk(base: DealInputs, spec: MonteCarloSpec, seed: int, chunk_index: int,
+              trials: int, backend: str = "loop") -> Tuple[List[List[float]], List[Optional[float]]]:
+    """
+    Run one chunk of trials with its own random stream.
+    
+    EUR multiplier and production risk both scale gross volumes, so they are
+    applied together through production_risk. The profile cache stores the
+    unrisked profile, so every trial reuses the base deal's entry, and each
+    trial only reruns the stages its sampled fields feed (MineralEvaluation.update).
+    
+    Returns:
+        (NPV per trial in base.discount_rates order, IRR per trial)
+    """
+    rng = random.Random(f"{seed}:{chunk_index}")
+    evaluation = MineralEvaluation(base, backend=backend)
+    evaluation.evaluate()
+    
+    npvs = []
+    irrs = []
+    for _ in range(trials):
+        changes = {}
+        if spec.production_risk or spec.eur_multiplier:
+            risk = spec.production_risk.sample(rng) if spec.production_risk else base.production_risk
+            eur_multiplier = spec.eur_multiplier.sample(rng) if spec.eur_multiplier else 1.0
+            changes["production_risk"] = max(0.0, risk * eur_multiplier)
+        if spec.gas_price_per_mcf:
+            changes["gas_price_per_mcf"] = spec.gas_price_per_mcf.sample(rng)
+        if spec.oil_price_per_bbl:
+            changes["oil_price_per_bbl"] = spec.oil_price_per_bbl.sample(rng)
+        if spec.undeveloped_delay_months:
+            changes["undeveloped_delay_months"] = max(0, int(round(spec.undeveloped_delay_months.sample(rng))))
+        
+        evaluation.update(**changes)
+        npvs.append([evaluation.npv_by_rate[rate] for rate in base.discount_rates])
+        irrs.append(evaluation.irr)
+    return npvs, irrs
+
+
+def _percentiles_converged(previous: Optional[Dict[str, float]], current: Dict[str, float],
+                           tolerance: float) -> bool:
+    if previous is None:
+        return False
+    scale = max(abs(value) for value in current.values()) or 1.0
+    return all(abs(current[level] - previous[level]) <= tolerance * scale for level in current)
+
+
+def run_monte_carlo(base: DealInputs, spec: MonteCarloSpec, trials: int = 10_000, seed: int = 0,
+                    chunk_size: int = 250, max_workers: Optional[int] = None,
+                    convergence_rate: float = 0.10, convergence_tolerance: Optional[float] = None,
+                    min_trials: int = 1_000, stable_chunks: int = 3,
+                    backend: str = "loop") -> MonteCarloResults:
+    """
+    Run a Monte Carlo valuation.
+    
+    Args:
+        base: Deal whose other inputs are held fixed
+        spec: Distributions to sample
+        trials: Maximum number of trials
+        seed: Random seed; the same seed and chunk_size give the same results
+        chunk_size: Trials per worker task
+        max_workers: Worker processes (default: all cores; 1 runs in-process)
+        convergence_rate: Discount rate whose NPV percentiles are watched
+        convergence_tolerance: Stop early once P90/P50/P10 NPV move less than
+            this fraction from chunk to chunk (None = run all trials)
+        min_trials: Never stop early before this many trials
+        stable_chunks: Consecutive chunks that must each stay within the
+            tolerance before stopping
+        backend: MineralEvaluation backend for the workers
+    
+    Returns:
+        MonteCarloResults
+    """
+    if convergence_rate not in base.discount_rates:
+        raise ValueError(f"convergence_rate {convergence_rate} is not in the deal's discount_rates")
+    rate_index = list(base.discount_rates).index(convergence_rate)
+    
+    chunk_trials = [min(chunk_size, trials - start) for start in range(0, trials, chunk_size)]
+    max_workers = max_workers or os.cpu_count() or 1
+    
+    results: Dict[int, Tuple[List[List[float]], List[Optional[float]]]] = {}
+    npvs: List[List[float]] = []
+    irrs: List[Optional[float]] = []
+    state = {"next": 0, "previous": None, "stable": 0, "converged": False}
+    
+    def absorb_in_order() -> bool:
+        # Consume finished chunks strictly in index order; True once converged
+        while state["next"] in results:
+            chunk_npvs, chunk_irrs = results.pop(state["next"])
+            npvs.extend(chunk_npvs)
+            irrs.extend(chunk_irrs)
+            state["next"] += 1
+            if convergence_tolerance is not None:
+                current = _p_values(sorted(row[rate_index] for row in npvs))
+                if _percentiles_converged(state["previous"], current, convergence_tolerance):
+                    state["stable"] += 1
+                else:
+                    state["stable"] = 0
+                state["previous"] = current
+                if state["stable"] >= stable_chunks and len(npvs) >= min_trials:
+                    state["converged"] = True
+                    return True
+        return False
+    
+    if max_workers == 1:
+        for chunk_index, n in enumerate(chunk_trials):
+            results[chunk_index] = run_chunk(base, spec, seed, chunk_index, n, backend)
+            if absorb_in_order():
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            next_submit = 0
+            while next_submit < len(chunk_trials) or pending:
+                # Keep every worker busy with a small backlog
+                while next_submit < len(chunk_trials) and len(pending) < max_workers * 2:
+                    future = executor.submit(run_chunk, base, spec, seed, next_submit,
+                                             chunk_trials[next_submit], backend)
+                    pending[future] = next_submit
+                    next_submit += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+                if absorb_in_order():
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+    
+    if state["converged"]:
+        logger.info(f"Monte Carlo converged after {len(irrs)} trials")
+    return MonteCarloResults(
+        seed=seed,
+        trials=len(irrs),
+        converged=state["converged"],
+        npv_by_rate={rate: [row[i] for row in npvs] for i, rate in enumerate(base.discount_rates)},
+        irr=irrs,
+    )
@@ -0,0 +1,269 @@
+"""
+Portfolio Aggregation
+Rolls many DealInputs up into portfolio-level monthly cash flows and metrics
+(NPV at each rate, IRR, MoM, payback) with per-deal contributions.
+
+Deals are evaluated in chunks across a process pool. Each worker sums its
+chunk's cash-flow columns before returning, so only one set of columns per
+chunk crosses process boundaries. Partial results stream as chunks finish;
+the final result reduces chunks in deal order, so it does not depend on the
+number of workers.
+
+Deals are aligned on the calendar: portfolio month 0 is the calendar month of
+the earliest base_date, and each deal's month 0 lands base_date's month
+later (days within a month are not distinguished, as in the engine).
+Portfolio NPVs and each deal's contribution NPVs are discounted to that
+common start, so contributions add up to the portfolio NPV.
+"""
+
+import os
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from core import CASH_FLOW_FIELDS, CashFlowLedger, DealInputs, MineralEvaluation, npv_at_rates, scan_cash_flows, solve_irr
+
+# Summed across deals (year/month are the shared timeline)
+SUMMED_FIELDS = tuple(name for name in CASH_FLOW_FIELDS if name not in ("year", "month"))
+
+
+@dataclass
+class DealContribution:
+    """One deal's stand-alone metrics inside the portfolio"""
+    deal_name: str
+    npv_by_rate: Dict[float, float]  # At the portfolio's rates, discounted to the portfolio start
+    irr: Optional[float]
+    mom: Optional[float]
+    acquisition_cost: float
+    cumulative_cash_flow: float
+
+
+@dataclass
+class ChunkResult:
+    """Column sums and contributions for deals[start:start + len(contributions)]"""
+    start: int
+    sums: Dict[str, array]
+    contributions: List[DealContribution]
+
+
+def month_offset(base_date: datetime, start_date: datetime) -> int:
+    """Calendar months from start_date's month to base_date's month"""
+    return (base_date.year - start_date.year) * 12 + (base_date.month - start_date.month)
+
+
+def evaluate_chunk(deals: Sequence[DealInputs], start: int, rates: Sequence[float],
+                   start_date: datetime, backend: str = "loop") -> ChunkResult:
+    """
+    Evaluate a chunk of deals and sum their cash-flow columns, each shifted
+    to its calendar month relative to start_date (worker entry point)
+    """
+    sums: Dict[str, array] = {name: array('d') for name in SUMMED_FIELDS}
+    contributions = []
+    for deal in deals:
+        evaluation = MineralEvaluation(deal, backend=backend)
+        evaluation.evaluate()
+        ledger = evaluation.cash_flows
+        offset = month_offset(deal.base_date, start_date)
+        for name in SUMMED_FIELDS:
+            _add_into(sums[name], ledger.column(name), offset)
+        npvs = npv_at_rates(ledger.net_cash_flow, rates)
+        contributions.append(DealContribution(
+            deal_name=deal.deal_name,
+            # Same (1 + rate)^(-month/12) factor as discount_factors, for the offset month
+            npv_by_rate={rate: npv * (1 + rate) ** (-offset / 12) for rate, npv in zip(rates, npvs)},
+            irr=evaluation.irr,
+            mom=evaluation.mom,
+            acquisition_cost=deal.acquisition_cost,
+            cumulative_cash_flow=evaluation.metrics.totals["cumulative_cash_flow"],
+        ))
+    return ChunkResult(start=start, sums=sums, contributions=contributions)
+
+
+def _add_into(total: array, values: Sequence[float], offset: int = 0):
+    """total[offset:] += values elementwise, growing total to the longer horizon"""
+    end = offset + len(values)
+    if end > len(total):
+        total.extend(array('d', bytes(8 * (end - len(total)))))
+    total[offset:end] = array('d', map(float.__add__, total[offset:end], values))
+
+
+@dataclass
+class PortfolioResults:
+    """Portfolio roll-up; partial while deals_evaluated < total_deals"""
+    name: str
+    deals_evaluated: int
+    total_deals: int
+    start_date: datetime  # Calendar month of cash_flows month 0
+    cash_flows: CashFlowLedger
+    npv_by_rate: Dict[float, float]
+    irr: Optional[float]
+    mom: Optional[float]
+    payback_months: Optional[int]
+    contributions: List[DealContribution]  # Evaluated deals, in deal order once complete
+    
+    @property
+    def complete(self) -> bool:
+        return self.deals_evaluated == self.total_deals
+    
+    def contribution_table(self, rate: float) -> List[Dict]:
+        """Deals ranked by NPV at a rate, with their share of portfolio NPV"""
+        portfolio_npv = self.npv_by_rate[rate]
+        rows = [
+            {
+                "deal_name": contribution.deal_name,
+                "npv": contribution.npv_by_rate[rate],
+                "share": contribution.npv_by_rate[rate] / portfolio_npv if portfolio_npv else None,
+                "irr": contribution.irr,
+                "mom": contribution.mom,
+                "acquisition_cost": contribution.acquisition_cost,
+            }
+            for contribution in self.contributions
+        ]
+        rows.sort(key=lambda row: row["npv"], reverse=True)
+        return rows
+    
+    def summary(self) -> Dict:
+        """Portfolio metrics in the shape of MineralEvaluation.summary()"""
+        ledger = self.cash_flows
+        total_capex = sum(ledger.capex)
+        acquisition_cost = sum(contribution.acquisition_cost for contribution in self.contributions)
+        return {
+            "deal_name": self.name,
+            "deal_count": self.deals_evaluated,
+            "irr": self.irr,
+            "mom": self.mom,
+            "payback_months": self.payback_months,
+            "npv_by_rate": self.npv_by_rate,
+            "acquisition_cost": acquisition_cost,
+            "total_capex": total_capex,
+            "total_revenue": sum(ledger.total_revenue),
+            "total_opex": sum(ledger.total_opex),
+            "total_tax": sum(ledger.total_tax),
+            "cumulative_cash_flow": sum(ledger.net_cash_flow),
+            "total_investment": acquisition_cost + total_capex,
+        }
+
+
+class Portfolio:
+    """
+    A book of deals evaluated and rolled up together.
+    
+    Usage:
+        portfolio = Portfolio(deals, name="2026 Book")
+        for partial in portfolio.iter_results(chunk_size=100):
+            print(partial.deals_evaluated, partial.npv_by_rate[0.10])
+        results = portfolio.evaluate()
+    """
+    
+    def __init__(self, deals: Iterable[DealInputs] = (), name: str = "Portfolio",
+                 discount_rates: Optional[Sequence[float]] = None):
+        self.deals: List[DealInputs] = list(deals)
+        self.name = name
+        self._discount_rates = list(discount_rates) if discount_rates is not None else None
+    
+    def add(self, deal: DealInputs):
+        self.deals.append(deal)
+    
+    def __len__(self) -> int:
+        return len(self.deals)
+    
+    @property
+    def start_date(self) -> datetime:
+        """First day of the earliest deal's base_date month (portfolio month 0)"""
+        if not self.deals:
+            return datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        earliest = min(deal.base_date for deal in self.deals)
+        return datetime(earliest.year, earliest.month, 1)
+    
+    @property
+    def discount_rates(self) -> List[float]:
+        """Portfolio NPV rates (defaults to the union of the deals' rates)"""
+        if self._discount_rates is not None:
+            return self._discount_rates
+        return sorted({rate for deal in self.deals for rate in deal.discount_rates})
+    
+    def evaluate(self, chunk_size: int = 100, max_workers: Optional[int] = None,
+                 backend: str = "loop") -> PortfolioResults:
+        """Evaluate every deal and return the final roll-up"""
+        results = None
+        for results in self.iter_results(chunk_size, max_workers, backend):
+            pass
+        return results
+    
+    def iter_results(self, chunk_size: int = 100, max_workers: Optional[int] = None,
+                     backend: str = "loop") -> Iterator[PortfolioResults]:
+        """
+        Evaluate in chunks, yielding a partial roll-up as each chunk finishes
+        and the final (deal-ordered) roll-up last.
+        
+        Args:
+            chunk_size: Deals per worker task
+            max_workers: Worker processes (default: all cores; 1 runs in-process)
+            backend: MineralEvaluation backend for the workers
+        """
+        rates = self.discount_rates
+        start_date = self.start_date
+        starts = list(range(0, len(self.deals), chunk_size))
+        max_workers = min(max_workers or os.cpu_count() or 1, max(len(starts), 1))
+        finished: List[ChunkResult] = []
+        running: Dict[str, array] = {name: array('d') for name in SUMMED_FIELDS}
+        running_contributions: List[DealContribution] = []
+        
+        def absorb(chunk: ChunkResult) -> PortfolioResults:
+            # Running totals in completion order, for partial results only
+            finished.append(chunk)
+            for name in SUMMED_FIELDS:
+                _add_into(running[name], chunk.sums[name])
+            running_contributions.extend(chunk.contributions)
+            return self._results(running, list(running_contributions), start_date)
+        
+        if max_workers == 1:
+            for start in starts:
+                partial = absorb(evaluate_chunk(self.deals[start:start + chunk_size], start, rates, start_date, backend))
+                if len(finished) < len(starts):
+                    yield partial
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                pending = {
+                    executor.submit(evaluate_chunk, self.deals[start:start + chunk_size], start, rates, start_date,
+                                    backend)
+                    for start in starts
+                }
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        partial = absorb(future.result())
+                    if pending:
+                        yield partial
+        
+        # Final roll-up in deal order, independent of completion order
+        finished.sort(key=lambda chunk: chunk.start)
+        sums: Dict[str, array] = {name: array('d') for name in SUMMED_FIELDS}
+        for chunk in finished:
+            for name in SUMMED_FIELDS:
+                _add_into(sums[name], chunk.sums[name])
+        yield self._results(sums, [contribution for chunk in finished for contribution in chunk.contributions],
+                            start_date)
+    
+    def _results(self, sums: Dict[str, array], contributions: List[DealContribution],
+                 start_date: datetime) -> PortfolioResults:
+        horizon = len(sums["net_cash_flow"])
+        columns: Dict[str, Sequence] = {name: array('d', values) for name, values in sums.items()}
+        columns["month"] = array('l', range(horizon))
+        columns["year"] = array('l', (month // 12 for month in range(horizon)))
+        ledger = CashFlowLedger.from_columns(columns)
+        metrics = scan_cash_flows(ledger.columns, self.discount_rates)
+        return PortfolioResults(
+            name=self.name,
+            deals_evaluated=len(contributions),
+            total_deals=len(self.deals),
+            start_date=start_date,
+            cash_flows=ledger,
+            npv_by_rate=metrics.npv_by_rate,
+            irr=solve_irr(ledger.net_cash_flow).rate if horizon else None,
+            mom=metrics.mom,
+            payback_months=metrics.payback_months,
+            contributions=contributions,
+        )
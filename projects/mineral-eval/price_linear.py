@@ -0,0 +1,137 @@
+"""
+Price-Linear Fast Path
+For a fixed timing and volume profile, net cash flow is linear in gas, oil
+and NGL price and (separately) in total NRI:
+
+    net[m] = nri × (gas_price × a_gas[m] + oil_price × a_oil[m]
+                    + ngl_price × a_ngl[m] + b[m]) + c[m]
+
+where a_* fold in BTU, ad valorem and severance, b holds the differential
+terms and c the price-independent costs (GP&T, fees, G&A). The coefficient
+vectors are built once per deal; any price/NRI combination then costs
+O(horizon) for the cash flow and O(1) per rate for NPV via pre-discounted sums.
+
+ngl_price defaults to the deal's own, so for a deal with a derived NGL price
+(ngl_price_per_bbl = 0.0) it moves with the oil price.
+
+Working-interest capex and opex (cost_bearing) depend on neither price nor
+NRI, so they sit in c. Results equal a full MineralEvaluation up to float
+rounding.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from core import DealInputs, IrrSolution, STAGE_FUNCTIONS, discount_factors, solve_irr
+
+
+class PriceLinearModel:
+    """Per-unit revenue/tax coefficient vectors for one deal's volume profile"""
+    
+    def __init__(self, inputs: DealInputs):
+        if inputs.economic_limit:
+            # The cut-off month moves with price, so cash flow is no longer linear in it
+            raise ValueError("price-linear model does not support economic_limit")
+        self.inputs = inputs
+        
+        # Volumes, costs and fees do not depend on price or NRI
+        columns: Dict[str, array] = {}
+        for stage in ("volumes", "costs", "fees"):
+            columns.update(STAGE_FUNCTIONS[stage](inputs, columns))
+        
+        after_ad_valorem = 1 - inputs.ad_valorem_tax_pct
+        btu = inputs.btu_adjustment
+        gas_coef = btu * after_ad_valorem - inputs.severance_tax_gas_pct
+        oil_coef = after_ad_valorem - inputs.severance_tax_oil_pct
+        ngl_coef = after_ad_valorem - inputs.severance_tax_ngl_pct
+        gas_diff = inputs.gas_differential_per_mcf * btu * after_ad_valorem
+        oil_diff = inputs.oil_differential_per_bbl * after_ad_valorem
+        
+        gross_gas = columns["gross_gas_mcf"]
+        gross_oil = columns["gross_oil_bbl"]
+        gross_ngl = columns["gross_ngl_bbl"]
+        
+        # Coefficients per $ of price and per unit of NRI
+        self.gas_coefficients = array('d', [gas * gas_coef for gas in gross_gas])
+        self.oil_coefficients = array('d', [oil * oil_coef for oil in gross_oil])
+        self.ngl_coefficients = array('d', [ngl * ngl_coef for ngl in gross_ngl])
+        # Differential terms per unit of NRI
+        self.differential_terms = array('d', [gas * gas_diff + oil * oil_diff for gas, oil in zip(gross_gas, gross_oil)])
+        # Price- and NRI-independent cash flow
+        self.fixed_cash_flow = array('d', [
+            -(opex + gpt + capex + acq + ga + monthly_ga)
+            for opex, gpt, capex, acq, ga, monthly_ga in zip(
+                columns["total_opex"], columns["gpt_cost"], columns["capex"],
+                columns["acquisition_cost"], columns["ga_fees"], columns["annual_ga"],
+            )
+        ])
+        self._discounted_sums: Dict[float, tuple] = {}
+    
+    @property
+    def horizon(self) -> int:
+        return len(self.fixed_cash_flow)
+    
+    def _resolve(self, gas_price, oil_price, ngl_price, nri):
+        oil_price = self.inputs.oil_price_per_bbl if oil_price is None else oil_price
+        if ngl_price is None:
+            # A derived NGL price follows the oil price asked for
+            ngl_price = self.inputs.ngl_price_at(oil_price)
+        return (
+            self.inputs.gas_price_per_mcf if gas_price is None else gas_price,
+            oil_price,
+            ngl_price,
+            self.inputs.total_nri if nri is None else nri,
+        )
+    
+    def cash_flow(self, gas_price: Optional[float] = None, oil_price: Optional[float] = None,
+                  ngl_price: Optional[float] = None, nri: Optional[float] = None) -> array:
+        """
+        Monthly net cash flow at the given prices/NRI (None = deal's own value).
+        O(horizon).
+        """
+        gas_price, oil_price, ngl_price, nri = self._resolve(gas_price, oil_price, ngl_price, nri)
+        return array('d', [
+            nri * (gas_price * a_gas + oil_price * a_oil + ngl_price * a_ngl + b) + c
+            for a_gas, a_oil, a_ngl, b, c in zip(
+                self.gas_coefficients, self.oil_coefficients, self.ngl_coefficients,
+                self.differential_terms, self.fixed_cash_flow,
+            )
+        ])
+    
+    def discounted_sums(self, rate: float) -> tuple:
+        """Pre-discounted (gas, oil, ngl, differential, fixed) sums at a rate, cached per rate"""
+        sums = self._discounted_sums.get(rate)
+        if sums is None:
+            factors = discount_factors(rate, self.horizon)
+            sums = tuple(
+                sum(value * factor for value, factor in zip(column, factors))
+                for column in (self.gas_coefficients, self.oil_coefficients, self.ngl_coefficients,
+                               self.differential_terms, self.fixed_cash_flow)
+            )
+            self._discounted_sums[rate] = sums
+        return sums
+    
+    def npv(self, rate: float, gas_price: Optional[float] = None, oil_price: Optional[float] = None,
+            ngl_price: Optional[float] = None, nri: Optional[float] = None) -> float:
+        """NPV at one rate. O(1) once discounted_sums(rate) is cached."""
+        gas_price, oil_price, ngl_price, nri = self._resolve(gas_price, oil_price, ngl_price, nri)
+        gas, oil, ngl, differential, fixed = self.discounted_sums(rate)
+        return nri * (gas_price * gas + oil_price * oil + ngl_price * ngl + differential) + fixed
+    
+    def npv_by_rate(self, gas_price: Optional[float] = None, oil_price: Optional[float] = None,
+                    ngl_price: Optional[float] = None, nri: Optional[float] = None,
+                    rates: Optional[Sequence[float]] = None) -> Dict[float, float]:
+        """NPV at each rate (defaults to the deal's discount_rates)"""
+        rates = self.inputs.discount_rates if rates is None else rates
+        return {rate: self.npv(rate, gas_price, oil_price, ngl_price, nri) for rate in rates}
+    
+    def irr(self, gas_price: Optional[float] = None, oil_price: Optional[float] = None,
+            ngl_price: Optional[float] = None, nri: Optional[float] = None) -> IrrSolution:
+        """IRR at the given prices/NRI (one cash-flow build plus the Newton solve)"""
+        return solve_irr(self.cash_flow(gas_price, oil_price, ngl_price, nri))
+    
+    def npv_grid(self, gas_prices: Sequence[float], oil_prices: Sequence[float], rate: float,
+                 ngl_price: Optional[float] = None, nri: Optional[float] = None) -> List[List[float]]:
+        """NPV for every gas × oil price pair at one rate (rows = gas, columns = oil)"""
+        return [[self.npv(rate, gas_price, oil_price, ngl_price, nri) for oil_price in oil_prices]
+                for gas_price in gas_prices]
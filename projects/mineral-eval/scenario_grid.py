@@ -0,0 +1,143 @@
+"""
+Price-Scenario Grid
+Evaluates one deal across every gas × oil PriceScenario from the price deck
+(price_deck_parser.parse_price_deck): an NPV cube (gas, oil, discount rate)
+and an IRR matrix (gas, oil) for the investment-committee grid.
+
+Volumes, costs and fees do not depend on price, so the deal's profile is
+built once (PriceLinearModel). Each scenario's monthly prices then apply as
+one array step: gas revenue depends only on the gas series and oil/NGL
+revenue only on the oil series, so
+
+    net[g, o, m] = nri × (gas_term[g, m] + oil_term[o, m] + b[m]) + c[m]
+
+is a broadcast sum over the distinct series, NPVs are one product with the
+discount-factor table and IRRs one batch.irr_vector solve.
+
+Requires numpy (see vectorized.py). Not for economic_limit deals (the
+PriceLinearModel scope).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from batch import irr_vector, npv_matrix
+from core import DealInputs
+from price_deck_parser import PriceScenario
+from price_linear import PriceLinearModel
+from vectorized import np, require_numpy
+
+
+@dataclass
+class ScenarioGrid:
+    """NPV cube and IRR matrix of one deal over a price deck"""
+    deal_name: str
+    gas_prices: List[float]  # Scenario gas_price_base along axis 0
+    oil_prices: List[float]  # Scenario oil_price_base along axis 1
+    discount_rates: List[float]  # Axis 2 of npv
+    scenario_names: List[List[Optional[str]]]  # None where the deck has no such pair
+    npv: 'np.ndarray'  # gas × oil × rate; NaN where there is no scenario
+    irr: 'np.ndarray'  # gas × oil; NaN where there is no scenario or no IRR
+    
+    def npv_table(self, rate: float) -> 'np.ndarray':
+        """gas × oil NPV matrix at one discount rate"""
+        return self.npv[:, :, self.discount_rates.index(rate)]
+    
+    def to_records(self) -> List[Dict]:
+        """One row per scenario (e.g. pandas.DataFrame(grid.to_records()))"""
+        records = []
+        for i, gas_price in enumerate(self.gas_prices):
+            for j, oil_price in enumerate(self.oil_prices):
+                if self.scenario_names[i][j] is None:
+                    continue
+                irr = self.irr[i, j]
+                records.append({
+                    "scenario": self.scenario_names[i][j],
+                    "gas_price": gas_price,
+                    "oil_price": oil_price,
+                    "irr": None if np.isnan(irr) else float(irr),
+                    "npv_by_rate": {rate: float(npv) for rate, npv in zip(self.discount_rates, self.npv[i, j])},
+                })
+        return records
+
+
+def scenario_price_index(scenario: PriceScenario, base_date: datetime, horizon: int) -> 'np.ndarray':
+    """
+    Deck row for each deal month. Month 0 is base_date's calendar month;
+    months before the deck starts use its first price and months past its
+    end hold the last price flat.
+    """
+    first = datetime.strptime(scenario.monthly_dates[0], "%Y-%m-%d")
+    offset = (base_date.year - first.year) * 12 + (base_date.month - first.month)
+    return np.clip(np.arange(horizon) + offset, 0, len(scenario.monthly_dates) - 1)
+
+
+def evaluate_scenario_grid(deal: DealInputs, scenarios: Sequence[PriceScenario],
+                           discount_rates: Optional[Sequence[float]] = None,
+                           ngl_price: Optional[float] = None) -> ScenarioGrid:
+    """
+    Evaluate a deal under every price scenario.
+    
+    Args:
+        deal: Deal to evaluate (its own gas/oil prices are ignored)
+        scenarios: e.g. list(parse_price_deck(path).values())
+        discount_rates: NPV rates (default: the deal's discount_rates)
+        ngl_price: Flat NGL price; None uses DealInputs.ngl_price_at each
+            month's oil price
+    
+    Returns:
+        ScenarioGrid with axes sorted by scenario base price
+    """
+    require_numpy()
+    if not scenarios:
+        raise ValueError("No price scenarios given")
+    rates = list(deal.discount_rates if discount_rates is None else discount_rates)
+    model = PriceLinearModel(deal)
+    horizon = model.horizon
+    a_gas = np.frombuffer(model.gas_coefficients)
+    a_oil = np.frombuffer(model.oil_coefficients)
+    a_ngl = np.frombuffer(model.ngl_coefficients)
+    
+    # Distinct gas and oil series (every oil scenario shares its series with the same oil base)
+    gas_series: Dict[float, 'np.ndarray'] = {}
+    oil_series: Dict[float, 'np.ndarray'] = {}
+    for scenario in scenarios:
+        index = scenario_price_index(scenario, deal.base_date, horizon)
+        if scenario.gas_price_base not in gas_series:
+            gas_series[scenario.gas_price_base] = np.asarray(scenario.monthly_gas_prices, dtype=float)[index]
+        if scenario.oil_price_base not in oil_series:
+            oil_series[scenario.oil_price_base] = np.asarray(scenario.monthly_oil_prices, dtype=float)[index]
+    gas_prices = sorted(gas_series)
+    oil_prices = sorted(oil_series)
+    
+    gas_terms = np.array([gas_series[price] for price in gas_prices]) * a_gas
+    oil = np.array([oil_series[price] for price in oil_prices])
+    ngl = deal.ngl_price_at(oil) if ngl_price is None else ngl_price
+    oil_terms = oil * a_oil + ngl * a_ngl
+    
+    nri = deal.total_nri
+    differential = np.frombuffer(model.differential_terms)
+    fixed = np.frombuffer(model.fixed_cash_flow)
+    net_cash_flow = nri * (gas_terms[:, None, :] + oil_terms[None, :, :] + differential) + fixed
+    flat = net_cash_flow.reshape(-1, horizon)
+    npv = npv_matrix(flat, rates).reshape(len(gas_prices), len(oil_prices), len(rates))
+    irr = irr_vector(flat).reshape(len(gas_prices), len(oil_prices))
+    
+    # Pairs the deck does not contain stay out of the grid
+    names: List[List[Optional[str]]] = [[None] * len(oil_prices) for _ in gas_prices]
+    for scenario in scenarios:
+        names[gas_prices.index(scenario.gas_price_base)][oil_prices.index(scenario.oil_price_base)] = scenario.name
+    missing = np.array([[name is None for name in row] for row in names])
+    npv[missing] = np.nan
+    irr[missing] = np.nan
+    
+    return ScenarioGrid(
+        deal_name=deal.deal_name,
+        gas_prices=gas_prices,
+        oil_prices=oil_prices,
+        discount_rates=rates,
+        scenario_names=names,
+        npv=npv,
+        irr=irr,
+    )
@@ -0,0 +1,181 @@
+"""
+Tornado Sensitivity Analysis
+One-at-a-time perturbations of a base DealInputs: each parameter is moved to
+its low and high value while everything else stays at base, and the NPV
+swings are ranked for a tornado chart.
+
+Cases are grouped by their volume profile (the fields feeding the "volumes"
+stage). Each group builds its profile once and applies its cases through
+MineralEvaluation.update, so price, tax, cost and NRI cases all share the base
+profile and only rerun the downstream stages. Groups run concurrently on a
+process pool.
+
+Besides DealInputs fields, two pseudo-parameters are supported:
+    eur_multiplier: scales gross volumes (via production_risk)
+    discount_rate: the rate NPV is measured at (no re-evaluation needed)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional, Tuple
+
+from core import DealInputs, MineralEvaluation, STAGE_FIELDS, npv_at_rates
+
+PSEUDO_PARAMETERS = ("eur_multiplier", "discount_rate")
+
+
+@dataclass
+class TornadoBar:
+    """Low/high outcome for one parameter"""
+    parameter: str
+    low_value: float
+    high_value: float
+    low_npv: float
+    high_npv: float
+    low_irr: Optional[float]
+    high_irr: Optional[float]
+    
+    @property
+    def swing(self) -> float:
+        return abs(self.high_npv - self.low_npv)
+
+
+@dataclass
+class TornadoResult:
+    """Ranked tornado dataset (largest swing first)"""
+    rate: float
+    base_npv: float
+    base_irr: Optional[float]
+    bars: List[TornadoBar]
+    
+    def to_records(self) -> List[Dict]:
+        """Flat rows for plotting (e.g. pandas.DataFrame(result.to_records()))"""
+        return [
+            {
+                "parameter": bar.parameter,
+                "low_value": bar.low_value,
+                "high_value": bar.high_value,
+                "low_npv": bar.low_npv,
+                "high_npv": bar.high_npv,
+                "low_delta": bar.low_npv - self.base_npv,
+                "high_delta": bar.high_npv - self.base_npv,
+                "low_irr": bar.low_irr,
+                "high_irr": bar.high_irr,
+                "swing": bar.swing,
+            }
+            for bar in self.bars
+        ]
+
+
+def _case_changes(base: DealInputs, parameter: str, value: float) -> Dict[str, float]:
+    """DealInputs field changes for one perturbed parameter"""
+    if parameter == "eur_multiplier":
+        return {"production_risk": base.production_risk * value}
+    if parameter == "discount_rate":
+        return {}
+    return {parameter: value}
+
+
+def evaluate_group(group_inputs: DealInputs, cases: List[Tuple[int, Dict[str, float], float]],
+                   backend: str = "loop") -> List[Tuple[int, float, Optional[float]]]:
+    """
+    Evaluate cases that share one volume profile.
+    
+    Args:
+        group_inputs: Base inputs with the group's volume-stage changes applied
+        cases: (case id, non-volume field changes, NPV rate)
+    
+    Returns:
+        (case id, NPV, IRR) per case
+    """
+    evaluation = MineralEvaluation(group_inputs, backend=backend)
+    evaluation.evaluate()
+    
+    results = []
+    previous: Dict[str, float] = {}
+    for case_id, changes, rate in cases:
+        # Undo the previous case's fields, then apply this case's
+        revert = {name: getattr(group_inputs, name) for name in previous if name not in changes}
+        if revert or changes:
+            evaluation.update(**revert, **changes)
+        previous = changes
+        npv = npv_at_rates(evaluation.cash_flows.net_cash_flow, [rate])[0]
+        results.append((case_id, npv, evaluation.irr))
+    return results
+
+
+def tornado(base: DealInputs, ranges: Dict[str, Tuple[float, float]], rate: float = 0.10,
+            max_workers: Optional[int] = 1, backend: str = "loop") -> TornadoResult:
+    """
+    Build a tornado dataset.
+    
+    Args:
+        base: Base-case deal
+        ranges: {parameter: (low, high)} - DealInputs field names or a pseudo-parameter
+        rate: Discount rate for the NPV being ranked
+        max_workers: Worker processes for the volume-profile groups (default
+            1 runs in-process; None = all cores). A typical tornado takes tens
+            of milliseconds, less than starting a pool, so only ask for
+            workers when each group is expensive (long horizons, big units).
+        backend: MineralEvaluation backend
+    
+    Returns:
+        TornadoResult with bars sorted by NPV swing
+    """
+    field_names = {f.name for f in fields(DealInputs)}
+    unknown = [name for name in ranges if name not in field_names and name not in PSEUDO_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown tornado parameters: {unknown}")
+    
+    volume_fields = STAGE_FIELDS["volumes"]
+    base_inputs = replace(base, discount_rates=[rate])
+    
+    # Case 0 is the base; identical perturbations share one case id
+    case_ids: Dict[Tuple, int] = {((), (), rate): 0}
+    groups: Dict[Tuple, List[Tuple[int, Dict[str, float], float]]] = {(): [(0, {}, rate)]}
+    bar_cases: List[Tuple[str, float, float, int, int]] = []
+    
+    for parameter, (low, high) in ranges.items():
+        ids = []
+        for value in (low, high):
+            changes = _case_changes(base, parameter, value)
+            case_rate = value if parameter == "discount_rate" else rate
+            volume_key = tuple(sorted((k, v) for k, v in changes.items() if k in volume_fields))
+            other = {k: v for k, v in changes.items() if k not in volume_fields}
+            key = (volume_key, tuple(sorted(other.items())), case_rate)
+            if key not in case_ids:
+                case_ids[key] = len(case_ids)
+                groups.setdefault(volume_key, []).append((case_ids[key], other, case_rate))
+            ids.append(case_ids[key])
+        bar_cases.append((parameter, low, high, ids[0], ids[1]))
+    
+    tasks = [(replace(base_inputs, **dict(volume_key)), cases) for volume_key, cases in groups.items()]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    outcomes: Dict[int, Tuple[float, Optional[float]]] = {}
+    if max_workers <= 1:
+        for group_inputs, cases in tasks:
+            for case_id, npv, irr in evaluate_group(group_inputs, cases, backend):
+                outcomes[case_id] = (npv, irr)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(evaluate_group, group_inputs, cases, backend) for group_inputs, cases in tasks]
+            for future in futures:
+                for case_id, npv, irr in future.result():
+                    outcomes[case_id] = (npv, irr)
+    
+    bars = [
+        TornadoBar(
+            parameter=parameter,
+            low_value=low,
+            high_value=high,
+            low_npv=outcomes[low_id][0],
+            high_npv=outcomes[high_id][0],
+            low_irr=outcomes[low_id][1],
+            high_irr=outcomes[high_id][1],
+        )
+        for parameter, low, high, low_id, high_id in bar_cases
+    ]
+    bars.sort(key=lambda bar: bar.swing, reverse=True)
+    base_npv, base_irr = outcomes[0]
+    return TornadoResult(rate=rate, base_npv=base_npv, base_irr=base_irr, bars=bars)
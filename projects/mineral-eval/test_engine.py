@@ -0,0 +1,557 @@
+"""
+Engine Regression Checks
+Assertion-based checks of the evaluation engine against independent
+references: backend parity, IRR roots, bid prices, the economic limit, the
+tract ledger and the caches.
+
+Run with pytest, or directly: python test_engine.py
+"""
+
+import math
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from core import (
+    CASH_FLOW_FIELDS, LEDGER_FIELDS, METRIC_FIELDS, STAGE_FIELDS, DealInputs, MineralEvaluation, Tract,
+    clear_discount_cache, discount_factors, npv_at_rates, solve_irr,
+)
+from vectorized import HAS_NUMPY
+
+
+def make_deal(**overrides) -> DealInputs:
+    """Two-unit gas/oil deal on decline-curve volumes (NGL, taxes, G&A all non-zero)"""
+    values = dict(
+        deal_name="Test Unit 1",
+        basin="Appalachia",
+        type_curve_id="TEST",
+        tracts=[
+            Tract(mineral_acres=40.0, royalty_rate=0.1875, drilling_unit_gross_acres=640.0, unit_name="Unit A"),
+            Tract(mineral_acres=25.0, royalty_rate=0.20, drilling_unit_gross_acres=640.0, unit_name="Unit B"),
+        ],
+        initial_gas_rate_mcf_per_day=4000.0,
+        initial_oil_rate_bbl_per_day=150.0,
+        decline_curve_type="hyperbolic",
+        ngl_yield_bbls_per_mmcf=60_000.0,
+        undeveloped_delay_months=6,
+        acquisition_cost=250_000.0,
+        upfront_ga_fees=5_000.0,
+        annual_ga=1_200.0,
+        severance_tax_ngl_pct=0.01,
+        analysis_years=20,
+        base_date=datetime(2026, 1, 1),
+    )
+    values.update(overrides)
+    return DealInputs(**values)
+
+
+# Cost-bearing working interest whose net cash flows change sign (so it has an IRR)
+WORKING_INTEREST = dict(cost_bearing=True, participation_wi=0.5, gas_price_per_mcf=8.0, oil_price_per_bbl=100.0)
+
+
+def evaluated(deal: DealInputs, backend: str = "loop") -> MineralEvaluation:
+    evaluation = MineralEvaluation(deal, backend=backend)
+    evaluation.evaluate()
+    return evaluation
+
+
+def assert_close(actual, expected, rel: float = 1e-9, abs_tol: float = 1e-6):
+    if actual is None or expected is None:
+        assert actual is expected, f"{actual} != {expected}"
+        return
+    assert math.isclose(actual, expected, rel_tol=rel, abs_tol=abs_tol), f"{actual} != {expected}"
+
+
+def assert_irr_is_root(evaluation: MineralEvaluation):
+    assert evaluation.irr is not None and evaluation.irr_solution.converged
+    assert abs(npv_at_rates(evaluation.cash_flows.net_cash_flow, [evaluation.irr])[0]) < 1e-6
+
+
+def assert_same_results(actual: MineralEvaluation, expected: MineralEvaluation):
+    """Identical ledgers and metrics (bit for bit)"""
+    for name in CASH_FLOW_FIELDS:
+        assert list(actual.cash_flows.column(name)) == list(expected.cash_flows.column(name)), name
+    assert actual.npv_by_rate == expected.npv_by_rate
+    assert actual.irr == expected.irr
+    assert actual.mom == expected.mom
+    assert actual.payback_period_months == expected.payback_period_months
+
+
+def test_numpy_backend_matches_loop():
+    pytest.importorskip("numpy")
+    for deal in (make_deal(), make_deal(**WORKING_INTEREST),
+                 make_deal(unit_development=True, gross_locations=4.0)):
+        loop = evaluated(deal)
+        vectorized = evaluated(deal, backend="numpy")
+        for name in CASH_FLOW_FIELDS:
+            assert list(vectorized.cash_flows.column(name)) == list(loop.cash_flows.column(name)), name
+        for rate, npv in loop.npv_by_rate.items():
+            assert_close(vectorized.npv_by_rate[rate], npv)
+        assert_irr_is_root(loop)
+        assert_close(vectorized.irr, loop.irr, rel=1e-12)
+
+
+def test_batch_matches_loop():
+    pytest.importorskip("numpy")
+    from batch import evaluate_batch
+    deals = [make_deal(), make_deal(oil_price_per_bbl=80.0, acquisition_cost=400_000.0),
+             make_deal(**WORKING_INTEREST)]
+    results = evaluate_batch(deals)
+    for i, deal in enumerate(deals):
+        evaluation = evaluated(deal)
+        assert_irr_is_root(evaluation)
+        expected = evaluation.summary()
+        actual = results.summary(i)
+        for rate, npv in expected["npv_by_rate"].items():
+            assert_close(actual["npv_by_rate"][rate], npv, rel=1e-9, abs_tol=1e-4)
+        assert_close(actual["irr"], expected["irr"], rel=1e-6)
+        assert_close(actual["cumulative_cash_flow"], expected["cumulative_cash_flow"], abs_tol=1e-4)
+
+    # Explicit rates, one of them outside every deal's own discount_rates
+    results = evaluate_batch(deals, discount_rates=[0.10, 0.40])
+    for i, deal in enumerate(deals):
+        npv_by_rate = results.summary(i)["npv_by_rate"]
+        assert list(npv_by_rate) == [0.10, 0.40]
+        fresh = evaluated(replace(deal, discount_rates=[0.10, 0.40]))
+        for rate, npv in fresh.npv_by_rate.items():
+            assert_close(npv_by_rate[rate], npv, rel=1e-9, abs_tol=1e-4)
+
+
+def test_irr_is_root_of_npv():
+    # 10% a year: -100 now, 110 in twelve months
+    solution = solve_irr([-100.0] + [0.0] * 11 + [110.0])
+    assert solution.converged
+    assert_close(solution.rate, 0.10, rel=1e-8)
+    
+    assert_irr_is_root(evaluated(make_deal()))
+    
+    assert solve_irr([100.0, 50.0]).rate is None  # No outflow, no sign change
+    assert solve_irr([-100.0, -50.0]).rate is None
+
+
+def test_horizon_metrics_match_shorter_evaluations():
+    from core import interpolated_irr
+    # The 100% rate puts most interpolated IRR guesses outside solve_irr's 0-1000% bracket
+    for rates in (None, [0.0, 0.10, 100.0]):
+        deal = make_deal() if rates is None else make_deal(discount_rates=rates)
+        metrics = evaluated(deal).horizon_metrics(irr_cutoff_years=range(1, deal.analysis_years + 1))
+        guesses = []
+        for years in range(1, deal.analysis_years + 1):
+            fresh = evaluated(replace(deal, analysis_years=years))
+            for rate in deal.discount_rates:
+                assert metrics.npv(years, rate) == fresh.npv_by_rate[rate], (years, rate)
+            assert_close(metrics.irr_by_years[years], fresh.irr, rel=1e-9)
+            guesses.append(interpolated_irr({rate: metrics.npv(years, rate) for rate in deal.discount_rates}))
+        assert metrics.npv_by_years(0.10) == [metrics.npv(years, 0.10) for years in range(1, deal.analysis_years + 1)]
+    assert any(guess is not None and guess > 10.0 for guess in guesses)
+
+
+def test_bid_price_meets_target():
+    from bid_price import solve_bid_price, solve_bid_prices
+    deal = make_deal()
+    bid = solve_bid_price(deal, target_irr=0.25)
+    assert_close(evaluated(replace(deal, acquisition_cost=bid.max_acquisition_cost)).irr, 0.25, rel=1e-6)
+    
+    bid = solve_bid_price(deal, target_pv_rate=0.10, target_pv=50_000.0)
+    priced = evaluated(replace(deal, acquisition_cost=bid.max_acquisition_cost, discount_rates=[0.10]))
+    assert_close(priced.npv_by_rate[0.10], 50_000.0, abs_tol=1e-4)
+    
+    package = solve_bid_prices([deal, make_deal(oil_price_per_bbl=75.0)], target_irr=0.25)
+    assert_close(package[0].max_acquisition_cost, solve_bid_price(deal, target_irr=0.25).max_acquisition_cost,
+                 abs_tol=1e-4)
+
+
+def test_economic_limit_keeps_tail_totals():
+    deal = make_deal(analysis_years=40)
+    full = evaluated(deal)
+    limited = evaluated(replace(deal, economic_limit=True, economic_limit_threshold=500.0))
+    tail = limited.truncated_tail
+    assert tail is not None
+    assert len(limited.cash_flows) == limited.economic_limit_month + 1 == tail.first_month
+    assert tail.first_month + tail.months == len(full.cash_flows)
+    assert_close(sum(limited.cash_flows.net_cash_flow) + tail.net_cash_flow,
+                 sum(full.cash_flows.net_cash_flow), abs_tol=1e-6)
+    assert limited.npv_by_rate[0.10] < full.npv_by_rate[0.10]  # The cut months were still cash positive
+
+
+def test_batch_economic_limit_matches_loop():
+    pytest.importorskip("numpy")
+    from batch import evaluate_batch
+    from bid_price import solve_bid_price, solve_bid_prices
+    deals = [make_deal(analysis_years=40, economic_limit=True, economic_limit_threshold=500.0),
+             make_deal(analysis_years=40, economic_limit=True, **WORKING_INTEREST),
+             make_deal(analysis_years=30)]
+    results = evaluate_batch(deals)
+    for i, deal in enumerate(deals):
+        evaluation = evaluated(deal)
+        assert_irr_is_root(evaluation)
+        expected = evaluation.summary()
+        actual = results.summary(i)
+        for rate, npv in expected["npv_by_rate"].items():
+            assert_close(actual["npv_by_rate"][rate], npv, rel=1e-9, abs_tol=1e-4)
+        assert_close(actual["irr"], expected["irr"], rel=1e-6)
+        assert actual["payback_months"] == expected["payback_months"]
+        for name in ("cumulative_cash_flow", "total_revenue", "total_opex", "total_capex", "total_tax"):
+            assert_close(actual[name], expected[name], abs_tol=1e-4)
+        assert actual.get("economic_limit_month") == expected.get("economic_limit_month")
+        if expected.get("truncated_tail"):
+            for name, value in expected["truncated_tail"].items():
+                assert_close(actual["truncated_tail"][name], value, abs_tol=1e-4)
+    assert results.summary(0)["truncated_tail"] is not None
+    
+    package = solve_bid_prices(deals[:1], target_irr=0.25)
+    assert_close(package[0].max_acquisition_cost, solve_bid_price(deals[0], target_irr=0.25).max_acquisition_cost,
+                 abs_tol=1e-4)
+
+
+def test_price_linear_rejects_economic_limit():
+    from price_linear import PriceLinearModel
+    with pytest.raises(ValueError, match="does not support economic_limit"):
+        PriceLinearModel(make_deal(economic_limit=True))
+
+
+def _changed_value(name: str, value):
+    """A different, valid value for a DealInputs field"""
+    if name == "tracts":
+        return [Tract(mineral_acres=60.0, royalty_rate=0.125, drilling_unit_gross_acres=640.0, unit_name="Unit C")]
+    if name == "decline_curve_type":
+        return "exponential" if value == "hyperbolic" else "hyperbolic"
+    if name == "discount_rates":
+        return [0.08, 0.10, 0.35]
+    if name == "monthly_gross_gas_volumes":
+        return [120.0 * 0.97 ** month for month in range(300)]
+    if name == "monthly_gross_oil_volumes":
+        return [4.0 * 0.96 ** month for month in range(300)]
+    if isinstance(value, bool):
+        return not value
+    if isinstance(value, int):
+        return value + 1
+    return value * 1.1 + 0.01
+
+
+def test_update_matches_fresh_evaluation():
+    # Every field any stage, the metrics or the ledger cut reads, on both backends
+    names = sorted(set().union(*STAGE_FIELDS.values()) | METRIC_FIELDS | LEDGER_FIELDS | {"deal_name", "base_date"})
+    bases = [{}, {**WORKING_INTEREST, "economic_limit": True, "economic_limit_threshold": 200.0,
+                  "ngl_price_per_bbl": 25.0}]
+    for backend in ("loop", "numpy") if HAS_NUMPY else ("loop",):
+        for overrides in bases:
+            base = make_deal(**overrides)
+            assert_irr_is_root(evaluated(base, backend))
+            for name in names:
+                if name == "base_date":
+                    change = {name: datetime(2027, 6, 1)}
+                elif name == "deal_name":
+                    change = {name: "Renamed"}
+                else:
+                    change = {name: _changed_value(name, getattr(base, name))}
+                evaluation = evaluated(make_deal(**overrides), backend)
+                evaluation.update(**change)
+                fresh = evaluated(make_deal(**{**overrides, **change}), backend)
+                try:
+                    assert_same_results(evaluation, fresh)
+                except AssertionError as e:
+                    raise AssertionError(f"update({name}=...) on {backend} {overrides}: {e}") from None
+
+
+def test_derived_ngl_price_follows_oil():
+    evaluation = evaluated(make_deal())
+    assert evaluation.inputs.ngl_price == 61.0 * 0.33
+    evaluation.update(oil_price_per_bbl=80.0)
+    assert evaluation.inputs.ngl_price == 80.0 * 0.33
+    assert_same_results(evaluation, evaluated(make_deal(oil_price_per_bbl=80.0)))
+    assert make_deal(ngl_price_per_bbl=25.0, oil_price_per_bbl=80.0).ngl_price == 25.0
+
+
+def test_price_linear_matches_fresh():
+    from price_linear import PriceLinearModel
+    deal = make_deal()
+    model = PriceLinearModel(deal)
+    for gas_price, oil_price in ((3.0, 45.0), (4.5, 90.0)):
+        fresh = evaluated(make_deal(gas_price_per_mcf=gas_price, oil_price_per_bbl=oil_price))
+        assert_close(model.npv(0.10, gas_price=gas_price, oil_price=oil_price), fresh.npv_by_rate[0.10], abs_tol=1e-6)
+
+
+def test_scenario_grid_matches_fresh():
+    pytest.importorskip("numpy")
+    from price_deck_parser import PriceScenario
+    from scenario_grid import evaluate_scenario_grid
+    dates = [f"{2026 + month // 12}-{month % 12 + 1:02d}-01" for month in range(360)]
+    scenarios = [PriceScenario(f"Gas_{gas}_Oil_{oil}", gas, oil, dates, [gas] * 360, [float(oil)] * 360)
+                 for gas in (3.0, 4.5) for oil in (60, 80)]
+    # Derived (oil-linked) and explicit NGL price
+    for overrides in ({}, {"ngl_price_per_bbl": 45.0}):
+        grid = evaluate_scenario_grid(make_deal(**overrides), scenarios)
+        for i, gas_price in enumerate(grid.gas_prices):
+            for j, oil_price in enumerate(grid.oil_prices):
+                fresh = evaluated(make_deal(gas_price_per_mcf=gas_price, oil_price_per_bbl=oil_price, **overrides))
+                for k, rate in enumerate(grid.discount_rates):
+                    assert_close(float(grid.npv[i, j, k]), fresh.npv_by_rate[rate], abs_tol=1e-4)
+                assert fresh.irr is not None
+                assert_close(float(grid.irr[i, j]), fresh.irr, rel=1e-6)
+
+
+def test_monte_carlo_trials_match_fresh():
+    from monte_carlo import Fixed, MonteCarloSpec, run_chunk
+    spec = MonteCarloSpec(eur_multiplier=Fixed(1.2), gas_price_per_mcf=Fixed(4.0), oil_price_per_bbl=Fixed(80.0))
+    npvs, irrs = run_chunk(make_deal(), spec, seed=1, chunk_index=0, trials=3)
+    fresh = evaluated(make_deal(production_risk=1.2, gas_price_per_mcf=4.0, oil_price_per_bbl=80.0))
+    assert npvs == [[fresh.npv_by_rate[rate] for rate in fresh.inputs.discount_rates]] * 3
+    assert irrs == [fresh.irr] * 3
+
+
+def test_monte_carlo_shares_profile_cache():
+    from core import clear_profile_cache, profile_cache_stats
+    from monte_carlo import MonteCarloSpec, Uniform, run_chunk
+    clear_profile_cache()
+    run_chunk(make_deal(), MonteCarloSpec(eur_multiplier=Uniform(0.5, 1.5), production_risk=Uniform(0.8, 1.0)),
+              seed=1, chunk_index=0, trials=50)
+    assert profile_cache_stats()["misses"] == 1
+    assert profile_cache_stats()["entries"] == 1
+
+
+def test_monte_carlo_convergence_needs_stable_chunks():
+    from monte_carlo import MonteCarloSpec, Uniform, run_monte_carlo
+    spec = MonteCarloSpec(gas_price_per_mcf=Uniform(2.5, 5.0), oil_price_per_bbl=Uniform(50.0, 90.0))
+    results = run_monte_carlo(make_deal(), spec, trials=3_000, chunk_size=100, max_workers=1,
+                              convergence_tolerance=0.05, min_trials=1_000, stable_chunks=3)
+    assert results.converged
+    assert 1_000 <= results.trials < 3_000
+
+
+def test_tornado_matches_fresh():
+    from sensitivity import tornado
+    deal = make_deal()
+    ranges = {"oil_price_per_bbl": (40.0, 90.0), "gas_price_per_mcf": (2.5, 5.0), "eur_multiplier": (0.7, 1.3),
+              "ngl_differential_pct_wti": (0.25, 0.45), "undeveloped_delay_months": (0, 18)}
+    result = tornado(deal, ranges, rate=0.10)
+    for bar in result.bars:
+        for value, npv, irr in ((bar.low_value, bar.low_npv, bar.low_irr), (bar.high_value, bar.high_npv, bar.high_irr)):
+            if bar.parameter == "eur_multiplier":
+                change = {"production_risk": deal.production_risk * value}
+            else:
+                change = {bar.parameter: value}
+            fresh = evaluated(make_deal(**change))
+            assert_close(npv, fresh.npv_by_rate[0.10], abs_tol=1e-6)
+            assert irr == fresh.irr, bar.parameter
+
+
+def test_portfolio_aligns_base_dates():
+    from portfolio import Portfolio
+    early = make_deal(deal_name="Early", base_date=datetime(2026, 1, 15))
+    late = make_deal(deal_name="Late", base_date=datetime(2027, 1, 3), acquisition_cost=100_000.0)
+    results = Portfolio([late, early]).evaluate(max_workers=1)
+    assert results.start_date == datetime(2026, 1, 1)
+    
+    early_flows = list(evaluated(early).cash_flows.net_cash_flow)
+    late_flows = list(evaluated(late).cash_flows.net_cash_flow)
+    expected = early_flows + [0.0] * 12
+    for month, value in enumerate(late_flows):
+        expected[month + 12] += value
+    assert list(results.cash_flows.net_cash_flow) == expected
+    
+    npv = evaluated(early).npv_by_rate[0.10] + evaluated(late).npv_by_rate[0.10] / 1.10
+    assert_close(results.npv_by_rate[0.10], npv, abs_tol=1e-4)
+    assert_close(sum(c.npv_by_rate[0.10] for c in results.contributions), results.npv_by_rate[0.10], abs_tol=1e-4)
+
+
+def test_iter_cash_flows_matches_ledger():
+    from core import clear_profile_cache, profile_cache_stats
+    deals = (make_deal(), make_deal(**WORKING_INTEREST),
+             make_deal(unit_development=True, gross_locations=4.0),
+             make_deal(analysis_years=40, economic_limit=True, economic_limit_threshold=500.0))
+    for deal in deals:
+        ledger = evaluated(deal).cash_flows
+        for stop, window_months in ((None, 60), (None, 7), (30, 12), (len(ledger) - 1, 60), (10_000, 60)):
+            rows = list(MineralEvaluation(deal).iter_cash_flows(stop=stop, window_months=window_months))
+            expected = len(ledger) if stop is None else min(stop, len(ledger))
+            assert len(rows) == expected, (stop, window_months)
+            for name in CASH_FLOW_FIELDS:
+                assert [getattr(row, name) for row in rows] == list(ledger.column(name)[:expected]), name
+    
+    # Streaming uses the full-horizon cache entries a full evaluation would
+    clear_profile_cache()
+    deal = make_deal()
+    list(MineralEvaluation(deal).iter_cash_flows(stop=24))
+    evaluated(deal)
+    assert profile_cache_stats()["entries"] == 1
+
+
+def test_exit_sweep_best_accepts_int_rates():
+    from exit_valuation import exit_sweep
+    sweep = exit_sweep(make_deal(discount_rates=[0.0, 0.10]), pdp_multiple=4.0, exit_years=[2, 5, 10])
+    assert sweep.best(0) is sweep.best(0.0)
+    assert sweep.best(0).npv_by_rate[0.0] == max(case.npv_by_rate[0.0] for case in sweep.cases)
+    assert sweep.best("mom") is not None
+
+
+def test_service_validates_columns():
+    from eval_service import parse_request
+    deal = {"deal_name": "Svc", "basin": "Appalachia", "type_curve_id": "TEST"}
+    assert parse_request({"deal": deal})[3] == ()
+    assert parse_request({"deal": deal, "columns": True})[3] == tuple(CASH_FLOW_FIELDS)
+    assert parse_request({"deal": deal, "columns": ["month", "net_cash_flow"]})[3] == ("month", "net_cash_flow")
+    for columns in ("net_cash_flow", {"month": 1}, 1, False):
+        with pytest.raises(ValueError, match='"columns" must be a list'):
+            parse_request({"deal": deal, "columns": columns})
+    with pytest.raises(ValueError, match="Unknown cash-flow columns: net_cashflow$"):
+        parse_request({"deal": deal, "columns": ["month", "net_cashflow"]})
+    with pytest.raises(ValueError, match=r"Unknown cash-flow columns: \['month'\]"):
+        parse_request({"deal": deal, "columns": [["month"]]})
+
+
+def test_tract_ledger_nri():
+    deal = make_deal()
+    expected = sum(tract.mineral_acres * tract.royalty_rate / tract.drilling_unit_gross_acres
+                   for tract in deal.tracts)
+    assert_close(deal.total_nri, expected, rel=1e-12)
+    assert_close(deal.tracts.unit_nri("Unit A"), 40.0 * 0.1875 / 640.0, rel=1e-12)
+    deal.tracts.append(Tract(10.0, 0.25, 640.0, "Unit A"))
+    assert_close(deal.tracts.unit_nri("Unit A"), (40.0 * 0.1875 + 10.0 * 0.25) / 640.0, rel=1e-12)
+    assert_close(deal.total_nri, expected + 10.0 * 0.25 / 640.0, rel=1e-12)
+
+
+def test_tract_ledger_list_api():
+    from core import TractLedger
+    a = Tract(40.0, 0.1875, 640.0, "Unit A")
+    b = Tract(25.0, 0.20, 640.0, "Unit B")
+    c = Tract(10.0, 0.25, 640.0, "Unit C")
+    ledger = TractLedger([a, b])
+    ledger.insert(0, c)
+    assert ledger == [c, a, b] and ledger.units == ["Unit C", "Unit A", "Unit B"]
+    assert ledger.pop() == b and ledger.units == ["Unit C", "Unit A"]
+    ledger.remove(c)
+    assert ledger == [a] and ledger.nri_by_unit() == {"Unit A": a.nri}
+    
+    # Replacing a unit's only tract drops the emptied unit
+    ledger[0] = b
+    assert ledger.units == ["Unit B"] and ledger.nri_by_unit() == {"Unit B": b.nri}
+    
+    combined = ledger + [a]
+    assert isinstance(combined, TractLedger) and combined == [b, a] and ledger == [b]
+    assert isinstance([c] + ledger, TractLedger)
+    ledger += [c]
+    assert ledger == [b, c] and ledger.total_nri == b.nri + c.nri
+    ledger.clear()
+    assert len(ledger) == 0 and ledger.units == [] and ledger.total_nri == 0.0
+
+
+def test_tract_ledger_tracts_are_read_only():
+    from dataclasses import FrozenInstanceError
+    deal = make_deal()
+    total_nri = deal.total_nri
+    tract = deal.tracts[0]
+    assert tract == Tract(40.0, 0.1875, 640.0, "Unit A")
+    with pytest.raises(FrozenInstanceError, match="read-only"):
+        tract.mineral_acres = 400.0
+    assert deal.tracts[0].mineral_acres == 40.0 and deal.total_nri == total_nri
+    
+    # Changes go through the ledger and reach the cached NRI
+    deal.tracts[0] = replace(tract, mineral_acres=400.0)
+    assert_close(deal.tracts.unit_nri("Unit A"), 400.0 * 0.1875 / 640.0, rel=1e-12)
+    assert_close(deal.total_nri, total_nri + 360.0 * 0.1875 / 640.0, rel=1e-12)
+
+
+def _integrated_volume(curve, years: float, steps: int = 200_000) -> float:
+    """Midpoint-rule integral of the daily rate over days"""
+    dt = years / steps
+    return sum(curve.rate((i + 0.5) * dt) for i in range(steps)) * dt * 365.0
+
+
+def test_arps_cumulative_matches_integral():
+    from arps import ArpsDecline
+    for b, terminal_decline in ((0.0, None), (1.0, None), (0.5, None), (1.3, None), (0.9, 0.08)):
+        curve = ArpsDecline(1_000.0, 0.8, b, terminal_decline)
+        for years in (0.5, 5.0, 30.0):
+            assert_close(curve.cumulative(years), _integrated_volume(curve, years), rel=1e-8)
+        
+        eur = 2_500_000.0
+        fitted = ArpsDecline.from_eur(eur, 0.8, b, life_years=30, terminal_decline=terminal_decline)
+        assert_close(sum(fitted.monthly_volumes(12 * 30)), eur, rel=1e-12)
+
+
+def test_arps_switches_to_terminal_decline():
+    from arps import ArpsDecline
+    curve = ArpsDecline(1_000.0, 0.8, 0.9, terminal_decline=0.08)
+    t_switch = curve.switch_time
+    assert_close(t_switch, (0.8 / 0.08 - 1) / (0.9 * 0.8), rel=1e-12)
+    # Hyperbolic decline has fallen to the terminal rate at the switch; exponential after it
+    assert_close(0.8 / (1 + 0.9 * 0.8 * t_switch), 0.08, rel=1e-12)
+    assert_close(curve.rate(t_switch), ArpsDecline(1_000.0, 0.8, 0.9).rate(t_switch), rel=1e-12)
+    for t in (t_switch + 1.0, t_switch + 10.0):
+        assert_close(curve.rate(t), curve.rate(t_switch) * math.exp(-0.08 * (t - t_switch)), rel=1e-12)
+    assert curve.rate(t_switch + 10.0) < ArpsDecline(1_000.0, 0.8, 0.9).rate(t_switch + 10.0)
+    assert ArpsDecline(1_000.0, 0.05, 0.9, terminal_decline=0.08).switch_time is None
+
+
+def test_eur_to_initial_rate_is_daily():
+    from core import ProductionDecline
+    # 1 MMMcf over 50 years; q0 × 365 × (closed-form cumulative of a unit rate in years)
+    assert_close(ProductionDecline.eur_to_initial_rate(1_000_000.0, 0.5),
+                 1_000_000.0 * 0.5 / (365.0 * -math.expm1(-25.0)), rel=1e-12)
+    assert_close(ProductionDecline.eur_to_initial_rate(1_000_000.0, 0.5), 1369.86301, rel=1e-8)
+    assert_close(ProductionDecline.eur_to_initial_rate(1_000_000.0, 1.0, "harmonic"),
+                 1_000_000.0 / (365.0 * math.log(51.0)), rel=1e-12)
+    # b = 0.5, di = 0.8: cumulative = q0 × 365 / 0.4 × (1 - 1/21)
+    q0 = ProductionDecline.eur_to_initial_rate(1_000_000.0, 0.8, "hyperbolic", b=0.5)
+    assert_close(q0, 1_000_000.0 * 21 / 18_250.0, rel=1e-12)
+    # The daily Riemann sum the old loop used lands within 0.1% of the EUR
+    daily = sum(ProductionDecline.hyperbolic_decline(q0, 0.8, 0.5, day / 365.0) for day in range(50 * 365))
+    assert_close(daily, 1_000_000.0, rel=1e-3)
+
+
+def test_discount_factor_cache():
+    clear_discount_cache()
+    first = discount_factors(0.10, 240)
+    assert discount_factors(0.10, 240) is first
+    assert_close(first[12], 1 / 1.10, rel=1e-12)
+    assert_close(first[7], 1.10 ** (-7 / 12), rel=1e-12)
+
+
+def test_evaluation_cache_matches_fresh():
+    from evaluation_cache import EvaluationCache, deal_hash
+    deal = make_deal()
+    assert deal_hash(deal) == deal_hash(replace(deal, deal_name="Renamed"))
+    assert deal_hash(deal) != deal_hash(replace(deal, gas_price_per_mcf=4.0))
+    
+    cache = EvaluationCache()
+    computed = cache.evaluate(deal)
+    hit = cache.evaluate(replace(deal, deal_name="Renamed"))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert hit.summary["deal_name"] == "Renamed"
+    fresh = evaluated(deal)
+    assert hit.summary["npv_by_rate"] == fresh.npv_by_rate == computed.summary["npv_by_rate"]
+    assert list(hit.ledger.net_cash_flow) == list(fresh.cash_flows.net_cash_flow)
+    
+    # Results are copies: changing one must not reach later hits
+    hit.summary["npv_by_rate"][0.10] = -1.0
+    hit.ledger.net_cash_flow[0] = -1.0
+    computed.summary["irr"] = -1.0
+    again = cache.evaluate(deal)
+    assert again.summary["npv_by_rate"] == fresh.npv_by_rate
+    assert again.summary["irr"] == fresh.irr
+    assert list(again.columns["net_cash_flow"]) == list(fresh.cash_flows.net_cash_flow)
+    
+    # put() stores its own copy: editing the evaluation it was given must not reach the cache
+    stored = make_deal(gas_price_per_mcf=4.0)
+    original = evaluated(stored)
+    npv_by_rate = dict(original.npv_by_rate)
+    cache.put(stored, original)
+    original.summary()["npv_by_rate"][0.10] = -1.0
+    original.npv_by_rate[0.0] = -1.0
+    assert cache.get(stored).summary["npv_by_rate"] == npv_by_rate
+
+
+if __name__ == "__main__":
+    checks = [(name, check) for name, check in list(globals().items()) if name.startswith("test_") and callable(check)]
+    skipped = 0
+    for name, check in checks:
+        try:
+            check()
+        except pytest.skip.Exception as e:
+            skipped += 1
+            print(f"skip  {name}: {e}")
+            continue
+        print(f"ok  {name}")
+    print(f"All {len(checks) - skipped} checks passed, {skipped} skipped")
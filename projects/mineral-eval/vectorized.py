@@ -0,0 +1,284 @@
+"""
+Vectorized Cash Flow Backend
+Computes every MineralEvaluation cash-flow column for the whole analysis
+horizon with NumPy array operations instead of the monthly Python loop.
+
+Optional: requires numpy. core.py stays standard-library only and only
+imports this module when MineralEvaluation(backend="numpy") is requested.
+Stages mirror core.STAGE_FUNCTIONS one for one, and results match the loop
+backend exactly (same operation order per column).
+"""
+
+from array import array
+from typing import Callable, Dict, Sequence, Tuple
+
+from core import (CASH_FLOW_FIELDS, CASH_FLOW_STAGES, SUMMARY_TOTAL_COLUMNS, CashFlowMetrics, DealInputs,
+                  discount_factors, production_curves, spud_schedule, well_cost_profile, working_interest)
+from core import volume_profile as cached_volume_profile
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+def require_numpy():
+    """Raise ImportError when numpy is not installed"""
+    if not HAS_NUMPY:
+        raise ImportError("numpy is required for the vectorized backend (pip install numpy)")
+
+
+def _build_volume_profile(inputs: DealInputs) -> Tuple[array, array]:
+    """
+    Gross gas and oil volumes per month after ramp and delay (production risk
+    is applied by core.volume_profile after the cache lookup).
+    
+    Mirrors the loop: nothing before undeveloped_delay_months, then a linear
+    ramp to the first type-curve month over undeveloped_timing_years, then the
+    type curve itself (zero once it runs out). Without type-curve volumes the
+    curves come from core.production_curves (decline fields).
+    
+    Returns:
+        (gross_gas, gross_oil) array('d') buffers of length analysis_years * 12,
+        the form core.volume_profile caches
+    """
+    horizon = inputs.analysis_years * 12
+    gross_gas = np.zeros(horizon)
+    gross_oil = np.zeros(horizon)
+    
+    gas_curve, oil_curve = production_curves(inputs)
+    if len(gas_curve) and inputs.unit_development:
+        # Spud-schedule convolution, one shifted add per spud month (same order as the loop)
+        for month, wells in spud_schedule(inputs):
+            if month >= horizon:
+                break
+            end = min(horizon, month + len(gas_curve))
+            gross_gas[month:end] += np.asarray(gas_curve[:end - month], dtype=float) * wells
+            if len(oil_curve):
+                oil_end = min(horizon, month + len(oil_curve))
+                gross_oil[month:oil_end] += np.asarray(oil_curve[:oil_end - month], dtype=float) * wells
+    elif len(gas_curve):
+        months_since_undeveloped = np.arange(horizon) - inputs.undeveloped_delay_months
+        ramp_duration_months = int(inputs.undeveloped_timing_years * 12)
+        
+        # Ramp: (month_index + 1) / ramp_duration × first type-curve month
+        in_ramp = (months_since_undeveloped >= 0) & (months_since_undeveloped < ramp_duration_months)
+        if in_ramp.any():
+            ramp_factor = (months_since_undeveloped[in_ramp] + 1) / ramp_duration_months
+            gross_gas[in_ramp] = gas_curve[0] * ramp_factor
+        
+        # After ramp: index straight into the type curve
+        tc_month_index = (months_since_undeveloped - ramp_duration_months).astype(int)
+        on_curve = (months_since_undeveloped >= ramp_duration_months) & (tc_month_index < len(gas_curve))
+        gross_gas[on_curve] = np.asarray(gas_curve, dtype=float)[tc_month_index[on_curve]]
+        
+        if len(oil_curve):
+            on_oil_curve = (months_since_undeveloped >= ramp_duration_months) & (tc_month_index < len(oil_curve))
+            gross_oil[on_oil_curve] = np.asarray(oil_curve, dtype=float)[tc_month_index[on_oil_curve]]
+    
+    return array('d', gross_gas.tobytes()), array('d', gross_oil.tobytes())
+
+
+def volume_profile(inputs: DealInputs) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Gross gas and oil arrays from the shared profile cache (see core.volume_profile)"""
+    require_numpy()
+    gross_gas, gross_oil = cached_volume_profile(inputs, build=_build_volume_profile)
+    return np.frombuffer(gross_gas), np.frombuffer(gross_oil)
+
+
+def timeline_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Month index and year of each row"""
+    month = np.arange(inputs.analysis_years * 12)
+    return {"year": month // 12, "month": month}
+
+
+def volumes_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Gross gas/oil after ramp, delay and risk; shrunk gas and gross NGL"""
+    gross_gas, gross_oil = volume_profile(inputs)
+    
+    # NGL from shrunk gas
+    shrunk_gas = gross_gas * inputs.gas_shrink_factor
+    gross_ngl = shrunk_gas * inputs.ngl_yield_bbls_per_mmcf / 1_000_000
+    return {
+        "gross_gas_mcf": gross_gas,
+        "gross_oil_bbl": gross_oil,
+        "gross_ngl_bbl": gross_ngl,
+        "shrunk_gas_mcf": shrunk_gas,
+    }
+
+
+def net_volumes_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Volumes net to interest (total NRI includes tracts + participation)"""
+    total_nri = inputs.total_nri
+    return {
+        "net_gas_mcf": columns["gross_gas_mcf"] * total_nri,
+        "net_oil_bbl": columns["gross_oil_bbl"] * total_nri,
+        "net_ngl_bbl": columns["gross_ngl_bbl"] * total_nri,
+    }
+
+
+def revenue_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Revenue by product at realized prices"""
+    gas_revenue = columns["net_gas_mcf"] * (inputs.gas_price_per_mcf + inputs.gas_differential_per_mcf) * inputs.btu_adjustment
+    oil_revenue = columns["net_oil_bbl"] * (inputs.oil_price_per_bbl + inputs.oil_differential_per_bbl)
+    ngl_revenue = columns["net_ngl_bbl"] * inputs.ngl_price
+    return {
+        "gas_revenue": gas_revenue,
+        "oil_revenue": oil_revenue,
+        "ngl_revenue": ngl_revenue,
+        "total_revenue": gas_revenue + oil_revenue + ngl_revenue,
+    }
+
+
+def costs_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Opex, GP&T and capex borne by the interest"""
+    zeros = np.zeros(inputs.analysis_years * 12)
+    
+    # Gas Processing & Transportation (cost-bearing leases only)
+    if inputs.is_cost_bearing_lease:
+        gpt_cost = columns["shrunk_gas_mcf"] * inputs.gas_processing_per_mcf
+    else:
+        gpt_cost = zeros
+    
+    if not inputs.cost_bearing:
+        # Lease/royalty basis: operator bears opex and capex
+        return {
+            "fixed_opex": zeros,
+            "variable_opex": zeros,
+            "total_opex": zeros,
+            "gpt_cost": gpt_cost,
+            "capex": zeros,
+        }
+    
+    # Working interest: our WI share of gross capex and opex (revenue stays NRI)
+    wi = working_interest(inputs)
+    gross_capex, producing_wells = well_cost_profile(inputs)
+    gross_oil, gross_gas = columns["gross_oil_bbl"], columns["gross_gas_mcf"]
+    gross_water = gross_oil * inputs.water_yield_bbls_per_bbl_oil + gross_gas * inputs.water_yield_bbls_per_mmcf
+    fixed_opex = np.frombuffer(producing_wells) * (inputs.fixed_opex_per_month * wi)
+    variable_opex = (
+        gross_oil * (inputs.variable_opex_oil_per_bbl * wi) +
+        gross_gas * (inputs.variable_opex_gas_per_mcf * wi) +
+        gross_water * (inputs.variable_opex_water_per_bblw * wi)
+    )
+    return {
+        "gross_water_bbl": gross_water,
+        "fixed_opex": fixed_opex,
+        "variable_opex": variable_opex,
+        "total_opex": fixed_opex + variable_opex,
+        "gpt_cost": gpt_cost,
+        "capex": np.frombuffer(gross_capex) * wi,
+    }
+
+
+def tax_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Severance and ad valorem taxes on our net revenue share"""
+    severance_tax = (
+        columns["net_oil_bbl"] * inputs.oil_price_per_bbl * inputs.severance_tax_oil_pct +
+        columns["net_gas_mcf"] * inputs.gas_price_per_mcf * inputs.severance_tax_gas_pct +
+        columns["net_ngl_bbl"] * inputs.ngl_price * inputs.severance_tax_ngl_pct
+    )
+    ad_valorem_tax = columns["total_revenue"] * inputs.ad_valorem_tax_pct
+    return {
+        "severance_tax": severance_tax,
+        "ad_valorem_tax": ad_valorem_tax,
+        "total_tax": severance_tax + ad_valorem_tax,
+    }
+
+
+def fees_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Acquisition cost and G&A fees at month 0, annual G&A amortized monthly"""
+    horizon = inputs.analysis_years * 12
+    acquisition_cost = np.zeros(horizon)
+    ga_fees = np.zeros(horizon)
+    if horizon:
+        acquisition_cost[0] = inputs.acquisition_cost
+        ga_fees[0] = inputs.upfront_ga_fees
+    return {
+        "acquisition_cost": acquisition_cost,
+        "ga_fees": ga_fees,
+        "annual_ga": np.full(horizon, inputs.annual_ga / 12.0),
+    }
+
+
+def net_cash_flow_stage(inputs: DealInputs, columns: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Net cash flow = revenue - costs - acquisition - GA"""
+    return {
+        "net_cash_flow": (
+            columns["total_revenue"] - columns["total_opex"] - columns["gpt_cost"] - columns["total_tax"]
+            - columns["capex"] - columns["acquisition_cost"] - columns["ga_fees"] - columns["annual_ga"]
+        ),
+    }
+
+
+# Same stages and names as core.STAGE_FUNCTIONS
+STAGE_FUNCTIONS: Dict[str, Callable[[DealInputs, Dict[str, 'np.ndarray']], Dict[str, 'np.ndarray']]] = {
+    "timeline": timeline_stage,
+    "volumes": volumes_stage,
+    "net_volumes": net_volumes_stage,
+    "revenue": revenue_stage,
+    "costs": costs_stage,
+    "tax": tax_stage,
+    "fees": fees_stage,
+    "net_cash_flow": net_cash_flow_stage,
+}
+
+
+def cash_flow_columns(inputs: DealInputs) -> Dict[str, 'np.ndarray']:
+    """
+    Compute all cash-flow columns for the analysis horizon.
+    
+    Returns:
+        Dict of column name (AnnualCashFlow field) to NumPy array
+    """
+    require_numpy()
+    columns = {}
+    for stage in CASH_FLOW_STAGES:
+        columns.update(STAGE_FUNCTIONS[stage](inputs, columns))
+    return {name: columns[name] for name in CASH_FLOW_FIELDS}
+
+
+def to_ledger_columns(columns: Dict[str, 'np.ndarray']) -> Dict[str, array]:
+    """Convert NumPy columns to array.array buffers for CashFlowLedger.from_columns"""
+    require_numpy()
+    converted = {}
+    for name, values in columns.items():
+        typecode = 'l' if name in ("year", "month") else 'd'
+        converted[name] = array(typecode, np.ascontiguousarray(values, dtype=typecode).tobytes())
+    return converted
+
+
+def scan_cash_flows(columns: Dict[str, Sequence[float]], rates: Sequence[float],
+                    convention: str = "annual") -> CashFlowMetrics:
+    """
+    core.scan_cash_flows as one matrix product: the discount-factor table with
+    a row of ones appended, times the net cash flow and summary-total columns,
+    gives every NPV and total at once. MoM and payback come from the same net
+    column. Matches the loop kernel to summation rounding.
+    """
+    require_numpy()
+    net_cash_flow = np.asarray(columns["net_cash_flow"], dtype=float)
+    horizon = len(net_cash_flow)
+    weights = np.empty((len(rates) + 1, horizon))
+    for row, rate in enumerate(rates):
+        weights[row] = np.frombuffer(discount_factors(rate, horizon, convention))
+    weights[-1] = 1.0
+    stacked = np.empty((horizon, len(SUMMARY_TOTAL_COLUMNS) + 1))
+    stacked[:, 0] = net_cash_flow
+    for col, name in enumerate(SUMMARY_TOTAL_COLUMNS.values(), start=1):
+        stacked[:, col] = np.asarray(columns[name], dtype=float)
+    products = weights @ stacked
+    
+    cumulative = np.cumsum(net_cash_flow)
+    paid_back = np.flatnonzero(cumulative >= 0)
+    totals = {key: float(products[-1, col]) for col, key in enumerate(SUMMARY_TOTAL_COLUMNS, start=1)}
+    totals["cumulative_cash_flow"] = float(products[-1, 0])
+    return CashFlowMetrics(
+        npv_by_rate={rate: float(npv) for rate, npv in zip(rates, products[:-1, 0])},
+        total_inflow=float(net_cash_flow[net_cash_flow > 0].sum()),
+        total_outflow=float(abs(net_cash_flow[net_cash_flow < 0].sum())),
+        payback_months=int(paid_back[0]) if len(paid_back) else None,
+        totals=totals,
+    )